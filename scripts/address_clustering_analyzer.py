@@ -8,6 +8,7 @@ that likely belong to the same entity (rug puller trading clusters).
 """
 
 import json
+import orjson
 import os
 import sys
 from typing import Dict, Any, List
@@ -203,8 +204,8 @@ class AddressClusteringAnalyzer:
             }
             
             # Save the result
-            with open(result_filepath, 'w', encoding='utf-8') as f:
-                json.dump(result_data, f, indent=2, ensure_ascii=False)
+            with open(result_filepath, 'wb') as f:
+                f.write(orjson.dumps(result_data, option=orjson.OPT_INDENT_2))
             
             print(f"✅ Saved clustering analysis to: {result_filepath}")
             
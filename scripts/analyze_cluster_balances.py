@@ -4,31 +4,122 @@ Script to analyze token balances for clustered addresses and identify pool balan
 """
 
 import argparse
+import hashlib
 import json
+import logging
+import orjson
 import sys
-from decimal import Decimal, getcontext
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 import os
 
-# Import the EtherscanSourceFetcher from fetch_token_source.py
-from fetch_token_source import EtherscanSourceFetcher
+# Diagnostics go to stderr so stdout carries only the JSON results
+logger = logging.getLogger(__name__)
 
-# Set precision for decimal calculations
-getcontext().prec = 50
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+# On-disk cache for Etherscan source responses and rugpull analyses
+CACHE_DIR = os.path.join('output', '.cache')
+SOURCE_CACHE_MAX_AGE_SECONDS = 24 * 60 * 60
+
+# How far into a '{'-prefixed source to look for the "sources" key before parsing it as JSON
+SOURCES_PROBE_CHARS = 4096
+
+# Shared pool for the IO-bound file loads and the network-bound contract analysis
+_executor = ThreadPoolExecutor(max_workers=4)
+
+# Etherscan's free tier allows 5 calls per second; concurrent analyses share this spacing
+ETHERSCAN_MIN_INTERVAL_SECONDS = 1 / 5
+_etherscan_lock = threading.Lock()
+_etherscan_last_call = 0.0
+
+def wait_for_etherscan_slot() -> None:
+    """Block until another Etherscan call fits within the rate limit"""
+    global _etherscan_last_call
+    with _etherscan_lock:
+        delay = _etherscan_last_call + ETHERSCAN_MIN_INTERVAL_SECONDS - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        _etherscan_last_call = time.monotonic()
+
+class BalanceRow(NamedTuple):
+    """One holder entry from the balances file, with the address lowercased"""
+    address: str
+    raw: int
+    formatted: str
+    eth: float
+    eth_wei: int
+
+def load_cached_json(cache_path: str, max_age_seconds: Optional[float] = None) -> Optional[Any]:
+    """Return the cached value at cache_path, or None if missing, unreadable or older than max_age_seconds"""
+    try:
+        if max_age_seconds is not None and time.time() - os.path.getmtime(cache_path) > max_age_seconds:
+            return None
+        with open(cache_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+def save_cached_json(cache_path: str, data: Any) -> None:
+    """Write data to cache_path, creating the cache directory if needed"""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'wb') as f:
+            f.write(orjson.dumps(data))
+    except Exception as e:
+        logger.warning("Could not write cache file '%s': %s", cache_path, e)
 
 def load_json_file(filepath: str) -> Optional[Dict]:
     """Load and parse JSON file"""
+    # Stays on stdlib json: raw token balances exceed 64 bits and orjson would parse them as floats
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError:
-        print(f"Error: File '{filepath}' not found")
+        logger.error("File '%s' not found", filepath)
         return None
     except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in '{filepath}': {e}")
+        logger.error("Invalid JSON in '%s': %s", filepath, e)
         return None
     except Exception as e:
-        print(f"Error loading '{filepath}': {e}")
+        logger.error("Error loading '%s': %s", filepath, e)
+        return None
+
+def load_first_timeline_record(filepath: str, chunk_size: int = 65536) -> Optional[Dict]:
+    """
+    Read only the first record of a JSON array file (the aggregated timeline),
+    decoding a growing prefix instead of parsing the whole file
+    """
+    decoder = json.JSONDecoder()
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            buffer = ''
+            while True:
+                chunk = f.read(chunk_size)
+                buffer += chunk
+                stripped = buffer.lstrip()
+                if stripped and not stripped.startswith('['):
+                    logger.error("Expected a JSON array in '%s'", filepath)
+                    return None
+                start = len(buffer) - len(stripped) + 1
+                while start < len(buffer) and buffer[start].isspace():
+                    start += 1
+                if start < len(buffer) and buffer[start] == ']':
+                    return None
+                try:
+                    first_record, _ = decoder.raw_decode(buffer, start)
+                    return first_record
+                except json.JSONDecodeError as e:
+                    if not chunk:
+                        logger.error("Invalid JSON in '%s': %s", filepath, e)
+                        return None
+    except FileNotFoundError:
+        logger.error("File '%s' not found", filepath)
+        return None
+    except Exception as e:
+        logger.error("Error loading '%s': %s", filepath, e)
         return None
 
 def get_total_supply_from_timeline(timeline_data: List[Dict]) -> Optional[int]:
@@ -39,17 +130,18 @@ def get_total_supply_from_timeline(timeline_data: List[Dict]) -> Optional[int]:
         
         first_record = timeline_data[0]
         
-        # Check if it's a transfer from zero address
-        from_address = first_record.get('from_address', '').lower()
-        if from_address == '0x0000000000000000000000000000000000000000':
+        # Check if it's a transfer from zero address (all digits, so no case normalization needed)
+        if first_record.get('from_address') == ZERO_ADDRESS:
             # Get the raw value from raw_data if available, otherwise use value
             raw_data = first_record.get('raw_data', {})
             total_supply = raw_data.get('value', first_record.get('value', 0))
+            if isinstance(total_supply, int):
+                return total_supply or None
             return int(total_supply) if total_supply else None
         
         return None
     except Exception as e:
-        print(f"Error extracting total supply: {e}")
+        logger.error("Error extracting total supply: %s", e)
         return None
 
 def get_cluster_addresses(clusters_data: Dict) -> List[str]:
@@ -58,50 +150,54 @@ def get_cluster_addresses(clusters_data: Dict) -> List[str]:
         addresses = clusters_data.get('result', {}).get('addresses', [])
         return [addr.lower() for addr in addresses]  # Normalize to lowercase
     except Exception as e:
-        print(f"Error extracting cluster addresses: {e}")
+        logger.error("Error extracting cluster addresses: %s", e)
         return []
 
-def find_pool_address(balances_data: Dict) -> Optional[str]:
+def index_balances(balances_data: Dict) -> Tuple[Dict[str, BalanceRow], Optional[str]]:
     """
-    Find the pool address (typically the address with the highest token balance)
+    Map lowercased address -> BalanceRow, converting each balance entry once.
+    The pool address (the address with the highest token balance) is tracked in
+    the same pass, so neither lookup needs another scan of the balances.
     """
     try:
-        balances = balances_data.get('balances', [])
-        if not balances:
-            return None
-        
-        # The balances appear to be sorted by token_balance_raw (highest first)
-        # The first entry should be the pool
-        highest_balance_entry = balances[0]
-        return highest_balance_entry.get('address', '').lower()
+        balance_map = {}
+        pool_address = None
+        pool_balance = -1
+        for entry in balances_data.get('balances', []):
+            row = BalanceRow(
+                entry['address'].lower(),
+                entry.get('token_balance_raw', 0),
+                entry.get('token_balance_formatted', '0'),
+                entry.get('eth_balance_eth', 0),
+                entry.get('eth_balance_wei', 0)
+            )
+            balance_map[row.address] = row
+            if row.raw > pool_balance:
+                pool_address, pool_balance = row.address, row.raw
+        return balance_map, pool_address
     except Exception as e:
-        print(f"Error finding pool address: {e}")
-        return None
+        logger.error("Error indexing balances: %s", e)
+        return {}, None
 
-def calculate_cluster_balance(cluster_addresses: List[str], balances_data: Dict) -> Dict:
+def calculate_cluster_balance(cluster_addresses: List[str], balance_map: Dict[str, BalanceRow]) -> Dict:
     """Calculate total token balance for cluster addresses"""
     try:
-        balances = balances_data.get('balances', [])
-        cluster_balances = []
-        total_raw_balance = 0
-        
-        # Create a mapping of address to balance data for faster lookup
-        balance_map = {entry['address'].lower(): entry for entry in balances}
+        # Keep the cluster's address order in individual_balances
+        cluster_rows = [balance_map[address] for address in cluster_addresses if address in balance_map]
+        cluster_balances = [
+            {
+                'address': row.address,
+                'token_balance_raw': row.raw,
+                'token_balance_formatted': row.formatted,
+                'eth_balance_eth': row.eth
+            }
+            for row in cluster_rows
+        ]
+        total_raw_balance = sum(row.raw for row in cluster_rows)
         
-        for address in cluster_addresses:
-            if address in balance_map:
-                entry = balance_map[address]
-                raw_balance = entry.get('token_balance_raw', 0)
-                total_raw_balance += raw_balance
-                
-                cluster_balances.append({
-                    'address': address,
-                    'token_balance_raw': raw_balance,
-                    'token_balance_formatted': entry.get('token_balance_formatted', '0'),
-                    'eth_balance_eth': entry.get('eth_balance_eth', 0)
-                })
-            else:
-                print(f"Warning: Address {address} not found in balance data")
+        missing_addresses = set(cluster_addresses) - balance_map.keys()
+        if missing_addresses:
+            logger.warning("%d cluster addresses not found in balance data (first 10: %s)", len(missing_addresses), sorted(missing_addresses)[:10])
         
         return {
             'total_addresses_in_cluster': len(cluster_addresses),
@@ -111,34 +207,176 @@ def calculate_cluster_balance(cluster_addresses: List[str], balances_data: Dict)
             'individual_balances': cluster_balances
         }
     except Exception as e:
-        print(f"Error calculating cluster balance: {e}")
+        logger.error("Error calculating cluster balance: %s", e)
         return {}
 
-def get_pool_balance(pool_address: str, balances_data: Dict) -> Dict:
+def get_pool_balance(pool_address: str, balance_map: Dict[str, BalanceRow]) -> Dict:
     """Get balance information for the pool address"""
     try:
-        balances = balances_data.get('balances', [])
-        balance_map = {entry['address'].lower(): entry for entry in balances}
-        
         if pool_address in balance_map:
-            entry = balance_map[pool_address]
+            row = balance_map[pool_address]
             return {
                 'pool_address': pool_address,
-                'token_balance_raw': entry.get('token_balance_raw', 0),
-                'token_balance_formatted': entry.get('token_balance_formatted', '0'),
-                'eth_balance_eth': entry.get('eth_balance_eth', 0),
-                'eth_balance_wei': entry.get('eth_balance_wei', 0)
+                'token_balance_raw': row.raw,
+                'token_balance_formatted': row.formatted,
+                'eth_balance_eth': row.eth,
+                'eth_balance_wei': row.eth_wei
             }
         else:
             return {'error': f'Pool address {pool_address} not found in balance data'}
     except Exception as e:
-        print(f"Error getting pool balance: {e}")
+        logger.error("Error getting pool balance: %s", e)
         return {'error': str(e)}
 
+def calculate_balance_ratios(cluster_balance: int, pool_balance: int, total_supply: int) -> Dict:
+    """Compute the cluster/pool/total supply ratios from already-computed raw balances"""
+    return {
+        'cluster_vs_pool_ratio_percent': (cluster_balance / pool_balance * 100) if pool_balance > 0 else 0,
+        'pool_vs_cluster_multiplier': (pool_balance / cluster_balance) if cluster_balance > 0 else 0,
+        'cluster_vs_total_supply_ratio_percent': (cluster_balance / total_supply * 100) if total_supply > 0 else 0,
+        'pool_vs_total_supply_ratio_percent': (pool_balance / total_supply * 100) if total_supply > 0 else 0
+    }
+
+def analyze_contract(token_address: str) -> Dict:
+    """
+    Fetch the token contract source code and run the rugpull risk analysis.
+    Returns 'contract_analysis' and 'rugpull_analysis' entries, plus 'error' if the analysis failed.
+    """
+    contract_results = {'contract_analysis': {}, 'rugpull_analysis': {}}
+    try:
+        # Imported here so runs without a token address skip the requests/GenAI client imports
+        from fetch_token_source import EtherscanSourceFetcher, RUGPULL_SOURCE_CHAR_LIMIT
+
+        logger.info("Fetching contract source code for token: %s", token_address)
+
+        # Initialize the Etherscan source fetcher
+        fetcher = EtherscanSourceFetcher()
+
+        # Fetch source code, reusing a recent cached response for this token
+        source_cache_path = os.path.join(CACHE_DIR, f"source_{token_address.lower()}.json")
+        source_response = load_cached_json(source_cache_path, SOURCE_CACHE_MAX_AGE_SECONDS)
+        if source_response is None:
+            wait_for_etherscan_slot()
+            source_response = fetcher.fetch_source_code(token_address)
+            save_cached_json(source_cache_path, source_response)
+        else:
+            logger.info("Using cached contract source code from %s", source_cache_path)
+
+        if source_response and 'result' in source_response and len(source_response['result']) > 0:
+            contract_info = source_response['result'][0]
+            contract_name = contract_info.get('ContractName', 'Unknown')
+            source_code = contract_info.get('SourceCode', '')
+
+            # Store contract analysis results
+            contract_results['contract_analysis'] = {
+                'contract_name': contract_name,
+                'compiler_version': contract_info.get('CompilerVersion', 'N/A'),
+                'optimization_used': contract_info.get('OptimizationUsed') == '1',
+                'runs': contract_info.get('Runs', 'N/A'),
+                'evm_version': contract_info.get('EVMVersion', 'N/A'),
+                'license_type': contract_info.get('LicenseType', 'N/A'),
+                'is_proxy': contract_info.get('Proxy') == '1',
+                'implementation': contract_info.get('Implementation', 'N/A'),
+                'source_code_available': bool(source_code and source_code.strip())
+            }
+
+            # Perform rugpull analysis if source code is available
+            if source_code and source_code.strip():
+                logger.info("Performing rugpull risk analysis...")
+
+                # Handle multi-file contracts (JSON format)
+                formatted_source_code = source_code
+                # Only standard-JSON bundles ("sources" key near the top) are worth a full parse;
+                # anything else starting with '{' is used as plain text, as it was after parsing
+                if source_code.startswith('{') and '"sources"' in source_code[:SOURCES_PROBE_CHARS]:
+                    try:
+                        # Remove extra braces if present
+                        if source_code.startswith('{{') and source_code.endswith('}}'):
+                            source_code = source_code[1:-1]
+
+                        source_json = orjson.loads(source_code)
+
+                        if 'sources' in source_json:
+                            # Multi-file contract - combine source files, stopping once the
+                            # characters the rugpull prompt actually uses are covered
+                            formatted_parts = []
+                            remaining_chars = RUGPULL_SOURCE_CHAR_LIMIT
+                            for file_data in source_json['sources'].values():
+                                file_content = file_data.get('content', '')
+                                formatted_parts.append(file_content)
+                                remaining_chars -= len(file_content) + 1
+                                if remaining_chars <= 0:
+                                    break
+                            formatted_source_code = "\n".join(formatted_parts)
+                    except orjson.JSONDecodeError:
+                        # If JSON parsing fails, use as plain text
+                        pass
+
+                # Perform rugpull analysis, cached by source hash so identical contracts share results
+                rugpull_cache_path = os.path.join(CACHE_DIR, f"rugpull_{hashlib.sha256(formatted_source_code.encode()).hexdigest()}.json")
+                # Only parsed analyses are cached; older entries holding raw model text count as a miss
+                cached_analysis = load_cached_json(rugpull_cache_path)
+                if isinstance(cached_analysis, (dict, list)):
+                    logger.info("Using cached rugpull analysis from %s", rugpull_cache_path)
+                    contract_results['rugpull_analysis'] = cached_analysis
+                else:
+                    rugpull_analysis_raw = fetcher.analyze_rugpull_risk(formatted_source_code, contract_name)
+
+                    # Try to parse the rugpull analysis as JSON
+                    try:
+                        # Strip markdown code fences (```json or ```) if present
+                        cleaned_analysis = rugpull_analysis_raw.strip().removeprefix('```json').removeprefix('```').removesuffix('```').strip()
+
+                        rugpull_analysis = orjson.loads(cleaned_analysis)
+                        contract_results['rugpull_analysis'] = rugpull_analysis
+                        # Cache only replies that parsed, so a truncated or malformed one is retried next run
+                        save_cached_json(rugpull_cache_path, rugpull_analysis)
+                    except orjson.JSONDecodeError as e:
+                        # If it's still not valid JSON, store as raw text with error details
+                        contract_results['rugpull_analysis'] = {
+                            'error': f'Failed to parse rugpull analysis as JSON: {str(e)}',
+                            'raw_analysis': rugpull_analysis_raw
+                        }
+            else:
+                contract_results['rugpull_analysis'] = {
+                    'error': 'No source code available for rugpull analysis'
+                }
+        else:
+            contract_results['contract_analysis'] = {
+                'error': 'Failed to fetch contract source code'
+            }
+            contract_results['rugpull_analysis'] = {
+                'error': 'Contract source code not available'
+            }
+    except Exception as e:
+        error_msg = f"Error during contract analysis: {str(e)}"
+        logger.warning("%s", error_msg)
+        contract_results['error'] = error_msg
+        contract_results['contract_analysis'] = {'error': error_msg}
+        contract_results['rugpull_analysis'] = {'error': error_msg}
+    
+    return contract_results
+
+def _submit(executor: Optional[ThreadPoolExecutor], fn, *args) -> Future:
+    """Submit fn to executor, or run it right away on the calling thread when there is none"""
+    if executor is not None:
+        return executor.submit(fn, *args)
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
 def analyze_token_data(clusters_file: str, balances_file: str, timeline_file: str) -> Dict:
     """Main analysis function that returns JSON results"""
-    # File paths are now parameters
-    
+    return analyze_one(clusters_file, balances_file, timeline_file, _executor)
+
+def analyze_one(clusters_file: str, balances_file: str, timeline_file: str, executor: Optional[ThreadPoolExecutor] = None) -> Dict:
+    """
+    Analyze one token's clusters, balances and timeline files. With an executor, the file
+    loads and the contract analysis run on it concurrently; without one they run inline.
+    """
     results = {
         'timestamp': None,
         'files_analyzed': {
@@ -155,19 +393,23 @@ def analyze_token_data(clusters_file: str, balances_file: str, timeline_file: st
         'errors': []
     }
     
-    # Load data files
-    clusters_data = load_json_file(clusters_file)
+    # Load data files concurrently; only the first timeline record is needed for the total supply
+    clusters_future = _submit(executor, load_json_file, clusters_file)
+    balances_future = _submit(executor, load_json_file, balances_file)
+    timeline_future = _submit(executor, load_first_timeline_record, timeline_file)
+    
+    clusters_data = clusters_future.result()
     if not clusters_data:
         results['errors'].append(f"Failed to load {clusters_file}")
         return results
     
-    balances_data = load_json_file(balances_file)
+    balances_data = balances_future.result()
     if not balances_data:
         results['errors'].append(f"Failed to load {balances_file}")
         return results
     
-    timeline_data = load_json_file(timeline_file)
-    if not timeline_data:
+    first_timeline_record = timeline_future.result()
+    if not first_timeline_record:
         results['errors'].append(f"Failed to load {timeline_file}")
         return results
     
@@ -176,11 +418,15 @@ def analyze_token_data(clusters_file: str, balances_file: str, timeline_file: st
     token_address = balances_data.get('metadata', {}).get('token_address')
     total_addresses = balances_data.get('metadata', {}).get('total_addresses', 0)
     
+    # Contract fetch and rugpull analysis run on a worker thread while the balance analysis proceeds
+    contract_future = _submit(executor, analyze_contract, token_address) if token_address else None
+    
     # Extract cluster addresses
     cluster_addresses = get_cluster_addresses(clusters_data)
+    balance_map, pool_address = index_balances(balances_data)
     
     # Get total supply from timeline
-    total_supply = get_total_supply_from_timeline(timeline_data)
+    total_supply = get_total_supply_from_timeline([first_timeline_record])
     results['total_supply_analysis'] = {
         'total_supply_raw': total_supply,
         'total_supply_formatted': f"{total_supply:,}" if total_supply else "N/A",
@@ -188,7 +434,7 @@ def analyze_token_data(clusters_file: str, balances_file: str, timeline_file: st
     }
     
     # Calculate cluster balances
-    cluster_analysis = calculate_cluster_balance(cluster_addresses, balances_data)
+    cluster_analysis = calculate_cluster_balance(cluster_addresses, balance_map)
     results['cluster_analysis'] = {
         'cluster_addresses': cluster_addresses,
         'cluster_id': clusters_data.get('result', {}).get('cluster_id'),
@@ -197,180 +443,107 @@ def analyze_token_data(clusters_file: str, balances_file: str, timeline_file: st
         **cluster_analysis
     }
     
-    # Find and analyze pool
-    pool_address = find_pool_address(balances_data)
+    # Analyze pool
+    pool_analysis = None
     if pool_address:
-        pool_analysis = get_pool_balance(pool_address, balances_data)
+        pool_analysis = get_pool_balance(pool_address, balance_map)
         results['pool_analysis'] = pool_analysis
     else:
         results['errors'].append("Could not identify pool address")
     
-    # Fetch contract source code and perform rugpull analysis
-    if token_address:
-        try:
-            print(f"Fetching contract source code for token: {token_address}")
-            
-            # Initialize the Etherscan source fetcher
-            fetcher = EtherscanSourceFetcher()
-            
-            # Fetch source code
-            source_response = fetcher.fetch_source_code(token_address)
-            
-            if source_response and 'result' in source_response and len(source_response['result']) > 0:
-                contract_info = source_response['result'][0]
-                contract_name = contract_info.get('ContractName', 'Unknown')
-                source_code = contract_info.get('SourceCode', '')
-                
-                # Store contract analysis results
-                results['contract_analysis'] = {
-                    'contract_name': contract_name,
-                    'compiler_version': contract_info.get('CompilerVersion', 'N/A'),
-                    'optimization_used': contract_info.get('OptimizationUsed') == '1',
-                    'runs': contract_info.get('Runs', 'N/A'),
-                    'evm_version': contract_info.get('EVMVersion', 'N/A'),
-                    'license_type': contract_info.get('LicenseType', 'N/A'),
-                    'is_proxy': contract_info.get('Proxy') == '1',
-                    'implementation': contract_info.get('Implementation', 'N/A'),
-                    'source_code_available': bool(source_code and source_code.strip())
-                }
-                
-                # Perform rugpull analysis if source code is available
-                if source_code and source_code.strip():
-                    print("Performing rugpull risk analysis...")
-                    
-                    # Handle multi-file contracts (JSON format)
-                    formatted_source_code = source_code
-                    if source_code.startswith('{'):
-                        try:
-                            # Remove extra braces if present
-                            if source_code.startswith('{{') and source_code.endswith('}}'):
-                                source_code = source_code[1:-1]
-                            
-                            source_json = json.loads(source_code)
-                            
-                            if 'sources' in source_json:
-                                # Multi-file contract - combine all source files
-                                formatted_parts = []
-                                for file_path, file_data in source_json['sources'].items():
-                                    file_content = file_data.get('content', '')
-                                    formatted_parts.append(file_content)
-                                formatted_source_code = "\n".join(formatted_parts)
-                        except json.JSONDecodeError:
-                            # If JSON parsing fails, use as plain text
-                            pass
-                    
-                    # Perform rugpull analysis
-                    rugpull_analysis_raw = fetcher.analyze_rugpull_risk(formatted_source_code, contract_name)
-                    
-                    # Try to parse the rugpull analysis as JSON
-                    try:
-                        # Strip markdown formatting if present
-                        cleaned_analysis = rugpull_analysis_raw.strip()
-                        if cleaned_analysis.startswith('```json'):
-                            # Remove ```json from the start and ``` from the end
-                            cleaned_analysis = cleaned_analysis[7:]  # Remove ```json
-                            if cleaned_analysis.endswith('```'):
-                                cleaned_analysis = cleaned_analysis[:-3]  # Remove closing ```
-                            cleaned_analysis = cleaned_analysis.strip()
-                        elif cleaned_analysis.startswith('```'):
-                            # Remove generic ``` formatting
-                            cleaned_analysis = cleaned_analysis[3:]
-                            if cleaned_analysis.endswith('```'):
-                                cleaned_analysis = cleaned_analysis[:-3]
-                            cleaned_analysis = cleaned_analysis.strip()
-                        
-                        rugpull_analysis = json.loads(cleaned_analysis)
-                        results['rugpull_analysis'] = rugpull_analysis
-                    except json.JSONDecodeError as e:
-                        # If it's still not valid JSON, store as raw text with error details
-                        results['rugpull_analysis'] = {
-                            'error': f'Failed to parse rugpull analysis as JSON: {str(e)}',
-                            'raw_analysis': rugpull_analysis_raw
-                        }
-                else:
-                    results['rugpull_analysis'] = {
-                        'error': 'No source code available for rugpull analysis'
-                    }
-            else:
-                results['contract_analysis'] = {
-                    'error': 'Failed to fetch contract source code'
-                }
-                results['rugpull_analysis'] = {
-                    'error': 'Contract source code not available'
-                }
-        except Exception as e:
-            error_msg = f"Error during contract analysis: {str(e)}"
-            print(f"Warning: {error_msg}")
-            results['errors'].append(error_msg)
-            results['contract_analysis'] = {'error': error_msg}
-            results['rugpull_analysis'] = {'error': error_msg}
+    # Ratios come straight from the balances computed above, with no further lookups
+    balance_ratios = None
+    if cluster_analysis and pool_analysis and 'error' not in pool_analysis and total_supply:
+        balance_ratios = calculate_balance_ratios(cluster_analysis['total_token_balance_raw'], pool_analysis['token_balance_raw'], total_supply)
+    
+    # Collect the contract analysis started above
+    if contract_future:
+        contract_results = contract_future.result()
+        results['contract_analysis'] = contract_results['contract_analysis']
+        results['rugpull_analysis'] = contract_results['rugpull_analysis']
+        if 'error' in contract_results:
+            results['errors'].append(contract_results['error'])
     else:
         results['errors'].append("No token address available for contract analysis")
     
     # Comparative analysis
-    if cluster_analysis and pool_address and total_supply:
-        pool_analysis = get_pool_balance(pool_address, balances_data)
-        
-        if 'error' not in pool_analysis:
-            cluster_balance = cluster_analysis['total_token_balance_raw']
-            pool_balance = pool_analysis['token_balance_raw']
-            
-            results['comparative_analysis'] = {
-                'token_address': token_address,
-                'total_addresses_analyzed': total_addresses,
-                'cluster_vs_pool_ratio_percent': (cluster_balance / pool_balance * 100) if pool_balance > 0 else 0,
-                'pool_vs_cluster_multiplier': (pool_balance / cluster_balance) if cluster_balance > 0 else 0,
-                'cluster_vs_total_supply_ratio_percent': (cluster_balance / total_supply * 100) if total_supply > 0 else 0,
-                'pool_vs_total_supply_ratio_percent': (pool_balance / total_supply * 100) if total_supply > 0 else 0,
-                'cluster_balance_raw': cluster_balance,
-                'pool_balance_raw': pool_balance,
-                'total_supply_raw': total_supply
-            }
+    if balance_ratios:
+        results['comparative_analysis'] = {
+            'token_address': token_address,
+            'total_addresses_analyzed': total_addresses,
+            **balance_ratios,
+            'cluster_balance_raw': cluster_analysis['total_token_balance_raw'],
+            'pool_balance_raw': pool_analysis['token_balance_raw'],
+            'total_supply_raw': total_supply
+        }
 
     # results = results['comparative_analysis']
     
     return results
 
+def analyze_many(jobs: List[Tuple[str, str, str]], max_workers: int = 8) -> List[Dict]:
+    """
+    Analyze several (clusters_file, balances_file, timeline_file) jobs on a pool of max_workers
+    threads, each job running its loads and contract analysis inline. Results are returned
+    in job order; Etherscan calls stay rate limited.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as batch_executor:
+        return list(batch_executor.map(lambda job: analyze_one(*job), jobs))
+
+# (source path in results, destination path in results_short) for the shortened output
+RESULTS_SHORT_FIELDS = (
+    (('cluster_analysis', 'confidence_level'), ('confidence_level',)),
+    (('cluster_analysis', 'reasoning'), ('reasoning',)),
+    (('cluster_analysis', 'total_addresses_in_cluster'), ('total_addresses_in_cluster',)),
+    (('comparative_analysis', 'pool_vs_total_supply_ratio_percent'), ('pool_vs_total_supply_ratio_percent',)),
+    (('rugpull_analysis', 'rugpull_risk_assessment', 'overall_risk_level'), ('rugpull_analysis', 'overall_risk_level')),
+    (('rugpull_analysis', 'rugpull_risk_assessment', 'summary_of_concerns'), ('rugpull_analysis', 'summary_of_concerns')),
+)
+
+_MISSING = object()
+
+def create_results_short(results: Dict) -> Dict:
+    """Copy the fields listed in RESULTS_SHORT_FIELDS that are present in results"""
+    results_short = {}
+    for source_path, target_path in RESULTS_SHORT_FIELDS:
+        value = results
+        for key in source_path:
+            value = value.get(key, _MISSING) if isinstance(value, dict) else _MISSING
+        if value is _MISSING:
+            continue
+        target = results_short
+        for key in target_path[:-1]:
+            target = target.setdefault(key, {})
+        target[target_path[-1]] = value
+    return results_short
+
 def main():
     """Main function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     try:
         parser = argparse.ArgumentParser(description="Analyze token balances for clustered addresses and identify pool balance")
         parser.add_argument("clusters_file", help="Path to the clusters JSON file")
         parser.add_argument("balances_file", help="Path to the token balances JSON file")
         parser.add_argument("timeline_file", help="Path to the aggregated timeline JSON file")
+        parser.add_argument("more_files", nargs="*", metavar="FILE",
+                            help="Further clusters, balances and timeline file triples to analyze in the same run")
         args = parser.parse_args()
+        if len(args.more_files) % 3:
+            parser.error("additional files must come in clusters/balances/timeline triples")
+        
+        if args.more_files:
+            # Several tokens: analyze them concurrently and print one entry per triple, in order
+            jobs = [(args.clusters_file, args.balances_file, args.timeline_file)]
+            jobs += [tuple(args.more_files[i:i + 3]) for i in range(0, len(args.more_files), 3)]
+            all_results = analyze_many(jobs)
+            output = [{'results': results, 'results_short': create_results_short(results)} for results in all_results]
+            print(json.dumps(output, indent=2, default=str))
+            return 1 if any(results.get('errors') for results in all_results) else 0
         
         results = analyze_token_data(args.clusters_file, args.balances_file, args.timeline_file)
         
         # Create shortened version with only key fields
-        results_short = {}
-        
-        # Extract from cluster_analysis
-        if 'cluster_analysis' in results:
-            cluster_data = results['cluster_analysis']
-            if 'confidence_level' in cluster_data:
-                results_short['confidence_level'] = cluster_data['confidence_level']
-            if 'reasoning' in cluster_data:
-                results_short['reasoning'] = cluster_data['reasoning']
-            if 'total_addresses_in_cluster' in cluster_data:
-                results_short['total_addresses_in_cluster'] = cluster_data['total_addresses_in_cluster']
-        
-        # Extract from comparative_analysis
-        if 'comparative_analysis' in results:
-            comparative_data = results['comparative_analysis']
-            if 'pool_vs_total_supply_ratio_percent' in comparative_data:
-                results_short['pool_vs_total_supply_ratio_percent'] = comparative_data['pool_vs_total_supply_ratio_percent']
-        
-        # Extract from rugpull_analysis
-        if 'rugpull_analysis' in results and isinstance(results['rugpull_analysis'], dict):
-            rugpull_data = results['rugpull_analysis']
-            if 'rugpull_risk_assessment' in rugpull_data:
-                risk_assessment = rugpull_data['rugpull_risk_assessment']
-                results_short['rugpull_analysis'] = {}
-                if 'overall_risk_level' in risk_assessment:
-                    results_short['rugpull_analysis']['overall_risk_level'] = risk_assessment['overall_risk_level']
-                if 'summary_of_concerns' in risk_assessment:
-                    results_short['rugpull_analysis']['summary_of_concerns'] = risk_assessment['summary_of_concerns']
+        results_short = create_results_short(results)
         
         # Output both versions
         output = {
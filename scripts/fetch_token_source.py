@@ -10,16 +10,19 @@ Usage:
 
 import argparse
 import json
+import orjson
 import os
 import sys
 import requests
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
-from google import genai
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Number of source code characters included in the rugpull analysis prompt
+RUGPULL_SOURCE_CHAR_LIMIT = 20000
+
 class EtherscanSourceFetcher:
     """Class to handle Etherscan API interactions for fetching contract source code."""
     
@@ -38,6 +41,8 @@ class EtherscanSourceFetcher:
         
         # Initialize GenAI client if API key is available
         if self.genai_api_key:
+            # The GenAI SDK is slow to import, so only load it when rugpull analysis is possible
+            from google import genai
             self.genai_client = genai.Client(api_key=self.genai_api_key)
         else:
             self.genai_client = None
@@ -230,7 +235,7 @@ The JSON output must conform to the following structure:
 
 Contract Code:
 ```solidity
-{source_code[:20000]}  // Limit to first 8000 characters to avoid token limits
+{source_code[:RUGPULL_SOURCE_CHAR_LIMIT]}
 ```
 """
 
@@ -291,7 +296,7 @@ Contract Code:
                     if source_code.startswith('{{') and source_code.endswith('}}'):
                         source_code = source_code[1:-1]
                     
-                    source_json = json.loads(source_code)
+                    source_json = orjson.loads(source_code)
                     
                     if 'sources' in source_json:
                         # Multi-file contract
@@ -307,7 +312,7 @@ Contract Code:
                         output.append(source_code)
                         formatted_source_code = source_code
                         
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     # If JSON parsing fails, treat as plain text
                     output.append(source_code)
                     formatted_source_code = source_code
@@ -1,145 +1,339 @@
 import pandas as pd
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from itertools import combinations
 from io import StringIO
 import networkx as nx
 from community import best_partition # This is from the python-louvain library
 import logging
-import json
+import orjson
+import csv
+import copy
+import hashlib
 
 # Set up logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+# Inputs up to this size are parsed with the csv module in a single pass; larger ones go through pandas
+STREAMING_PARSE_MAX_CHARS = 8_000_000
+# Most recent analyze_rugpuller_cluster results, keyed on (input digest, token, pair)
+ANALYSIS_CACHE_SIZE = 128
+_analysis_cache = OrderedDict()
+
+# pandas' default read_csv NA tokens; the streaming reader treats them as missing too
+NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+def _parse_str(value):
+    return '' if value is None or value in NA_VALUES else value
+
+def _parse_float(value):
+    try:
+        return float(value.replace(',', ''))
+    except (AttributeError, ValueError):
+        return float('nan')
+
+def _parse_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+def _read_events_streaming(data_string):
+    """
+    Parses the tab-separated data with the csv module, dispatching each row on its
+    event_type as it is read. Returns the same event lists as _read_events_dataframe.
+    """
+    reader = csv.DictReader(StringIO(data_string), delimiter='\t')
+    reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+    events = {"num_rows": 0, "columns": reader.fieldnames, "initial_transfer_recipients": [], "minters": [], "swaps": [], "transfers": []}
+
+    for row in reader:
+        events["num_rows"] += 1
+        event_type = row.get('event_type')
+        if event_type == 'Transfer':
+            from_addr = _parse_str(row.get('from_address')).lower()
+            to_addr = _parse_str(row.get('to_address')).lower()
+            if from_addr == ZERO_ADDRESS:
+                events["initial_transfer_recipients"].append(to_addr)
+            events["transfers"].append((from_addr, to_addr, _parse_float(_parse_str(row.get('value_formatted'))), _parse_int(_parse_str(row.get('block_number')))))
+        elif event_type == 'Mint':
+            events["minters"].append(_parse_str(row.get('initiators')).lower())
+        elif event_type == 'V2_Swap':
+            events["swaps"].append((_parse_str(row.get('initiators')).lower(), _parse_int(_parse_str(row.get('block_number'))), _parse_str(row.get('transaction_type')), _parse_float(_parse_str(row.get('value_formatted')))))
+
+    return events
+
+def _read_events_dataframe(data_string):
+    """
+    Parses the tab-separated data with pandas and extracts the Transfer, Mint and
+    V2_Swap event lists consumed by the graph construction.
+    """
+    df = pd.read_csv(StringIO(data_string), sep='\t', dtype=str)
+    df.columns = df.columns.str.strip()
+
+    df['value_formatted'] = df['value_formatted'].str.replace(',', '', regex=False).astype(float)
+    df['initiators'] = df['initiators'].str.lower().fillna('')
+    df['from_address'] = df['from_address'].str.lower().fillna('')
+    df['to_address'] = df['to_address'].str.lower().fillna('')
+    df['block_number'] = pd.to_numeric(df['block_number'], errors='coerce').fillna(0).astype(int)
+    df['transaction_type'] = df['transaction_type'].fillna('')
+    # Share one category set across the address columns so comparisons and isin work on integer codes
+    address_columns = ['from_address', 'to_address', 'initiators']
+    address_categories = pd.api.types.union_categoricals([df[col].astype('category') for col in address_columns]).categories
+    for col in address_columns:
+        df[col] = pd.Categorical(df[col], categories=address_categories)
+    # Low-cardinality label columns: the event_type filters below compare integer codes
+    df['event_type'] = df['event_type'].astype('category')
+    df['transaction_type'] = df['transaction_type'].astype('category')
+
+    # Split by event type in one pass instead of one boolean mask per type
+    events_by_type = dict(tuple(df.groupby('event_type', observed=True, sort=False)))
+    transfers_df = events_by_type.get('Transfer', df.iloc[:0])
+    v2_swaps_df = events_by_type.get('V2_Swap', df.iloc[:0])
+    mint_df = events_by_type.get('Mint', df.iloc[:0])
+    return {
+        "num_rows": len(df),
+        "columns": list(df.columns),
+        "initial_transfer_recipients": transfers_df.loc[transfers_df['from_address'] == ZERO_ADDRESS, 'to_address'].tolist(),
+        "minters": mint_df['initiators'].tolist(),
+        "swaps": list(zip(v2_swaps_df['initiators'].tolist(), v2_swaps_df['block_number'].tolist(), v2_swaps_df['transaction_type'].tolist(), v2_swaps_df['value_formatted'].tolist())),
+        "transfers": list(zip(transfers_df['from_address'].tolist(), transfers_df['to_address'].tolist(), transfers_df['value_formatted'].tolist(), transfers_df['block_number'].tolist())),
+    }
+
+def _community_stats(communities, G, source_linked_addresses, swap_count, buy_count, sell_count):
+    """
+    Aggregates per-community trading statistics into parallel lists indexed by
+    community, using one pass over the graph edges and the per-address BUY/SELL counts.
+    """
+    labels = {addr: idx for idx, members in enumerate(communities) for addr in members}
+    n = len(communities)
+    stats = {
+        "num_members": [len(members) for members in communities],
+        "total_buys": [0] * n,
+        "total_sells": [0] * n,
+        "coordinated_edges": [0] * n,
+        "has_coord_buys": [False] * n,
+        "source_linked": [False] * n,
+        "single_member_swap_count": [swap_count[members[0]] if len(members) == 1 else 0 for members in communities],
+    }
+
+    for addr in source_linked_addresses:
+        idx = labels.get(addr)
+        if idx is not None:
+            stats["source_linked"][idx] = True
+
+    for u, v, data in G.edges(data=True):
+        if data.get('type') == 'coordinated_swap' and labels[u] == labels[v]:
+            idx = labels[u]
+            stats["coordinated_edges"][idx] += 1
+            if data.get('action_details', '').startswith("BUY"):
+                stats["has_coord_buys"][idx] = True
+
+    for addr, count in buy_count.items():
+        idx = labels.get(addr)
+        if idx is not None:
+            stats["total_buys"][idx] += count
+    for addr, count in sell_count.items():
+        idx = labels.get(addr)
+        if idx is not None:
+            stats["total_sells"][idx] += count
+
+    return stats
+
+def _evaluate_community(stats, i, with_reasoning=False):
+    """
+    Scores community i from its aggregated stats. Reasoning strings are only
+    built when requested, so the scoring pass stays purely numeric.
+    Returns (score, reasoning_parts).
+    """
+    num_members = stats["num_members"][i]
+    total_buys = stats["total_buys"][i]
+    total_sells = stats["total_sells"][i]
+    coordinated_edges = stats["coordinated_edges"][i]
+    score = 0
+    reasoning_parts = []
+
+    if coordinated_edges > 0:
+        score += num_members * 2 + coordinated_edges * 2.5
+        if with_reasoning:
+            reasoning_parts.append(f"{num_members} addresses show {coordinated_edges} internal links from same-block-identical-value swaps.")
+
+    if total_buys > 0 and total_sells > 0:
+        score += 3
+        if with_reasoning:
+            reasoning_parts.append(f"Cluster members performed {total_buys} BUYs and {total_sells} SELLs.")
+        if stats["has_coord_buys"][i]:
+            score += 2.5
+            if with_reasoning:
+                reasoning_parts.append("Evidence of coordinated BUYs followed by SELLs by cluster members.")
+    elif total_buys > 0 or total_sells > 0:
+        score += 1
+        if with_reasoning:
+            reasoning_parts.append(f"Cluster members performed {total_buys} BUYs and {total_sells} SELLs (predominantly one-sided).")
+
+    if stats["source_linked"][i]:
+        score += 1.5
+        if with_reasoning:
+            reasoning_parts.append("Cluster is linked to initial token source/minter.")
+
+    if num_members == 1 and stats["single_member_swap_count"][i] > 4 and total_buys > 1 and total_sells > 1:
+        score += 2
+        if with_reasoning:
+            reasoning_parts.append("Single address with significant buy/sell activity, potential self-wash trading.")
+
+    return score, reasoning_parts
+
 def analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, pair_address_to_exclude: str):
     """
     Analyzes transaction data to identify one primary rug puller owner cluster,
     ensuring all source addresses are included. Uses graph-based community detection.
     Also analyzes links of most active traders to this owner cluster.
+
+    Results are memoized on a blake2b digest of the input and the excluded addresses;
+    callers always receive their own copy.
     """
+    cache_key = (hashlib.blake2b(data_string.encode(), digest_size=16).hexdigest(), token_address_to_exclude, pair_address_to_exclude)
+    if cache_key in _analysis_cache:
+        _analysis_cache.move_to_end(cache_key)
+        logger.info("Returning cached cluster analysis for identical input")
+        return copy.deepcopy(_analysis_cache[cache_key])
+
+    result = _analyze_rugpuller_cluster(data_string, token_address_to_exclude, pair_address_to_exclude)
+    _analysis_cache[cache_key] = copy.deepcopy(result)
+    if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+    return result
+
+def _analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, pair_address_to_exclude: str):
     logger.info("=== Starting rugpuller cluster analysis ===")
     logger.info(f"Token to exclude: {token_address_to_exclude}")
     logger.info(f"Pair to exclude: {pair_address_to_exclude}")
     
     try:
-        df = pd.read_csv(StringIO(data_string), sep='\t', dtype=str)
-        df.columns = df.columns.str.strip()
-        logger.info(f"Successfully parsed CSV data with {len(df)} rows and columns: {list(df.columns)}")
+        if len(data_string) <= STREAMING_PARSE_MAX_CHARS:
+            events = _read_events_streaming(data_string)
+        else:
+            events = _read_events_dataframe(data_string)
+        logger.info(f"Successfully parsed CSV data with {events['num_rows']} rows and columns: {events['columns']}")
     except Exception as e:
         logger.error(f"Failed to parse CSV data: {e}")
         return {"error": f"Failed to parse CSV data: {e}"}
 
-    # --- 1. Data Preprocessing ---
-    logger.info("=== Starting data preprocessing ===")
-    df['value_formatted'] = df['value_formatted'].str.replace(',', '', regex=False).astype(float)
-    df['initiators'] = df['initiators'].str.lower().fillna('')
-    df['from_address'] = df['from_address'].str.lower().fillna('')
-    df['to_address'] = df['to_address'].str.lower().fillna('')
-    df['block_number'] = pd.to_numeric(df['block_number'], errors='coerce').fillna(0).astype(int)
-    logger.info("Completed data type conversions and normalization")
-
-    excluded_addresses = set()
-    if token_address_to_exclude: excluded_addresses.add(token_address_to_exclude.lower())
-    if pair_address_to_exclude: excluded_addresses.add(pair_address_to_exclude.lower())
-    logger.info(f"Excluded addresses: {excluded_addresses}")
+    excluded_addresses = frozenset(addr.lower() for addr in (token_address_to_exclude, pair_address_to_exclude) if addr)
+    logger.info(f"Excluded addresses: {set(excluded_addresses)}")
+    # Excluded addresses plus the empty/'nan' placeholders, so each row needs a single membership test
+    skipped_addresses = excluded_addresses | {'', 'nan'}
 
     G = nx.Graph()
     source_addresses = set()
     all_swappers = set() # To store all unique swapper addresses not in excluded_addresses
-    address_swap_actions = defaultdict(list)
-    address_attributes = defaultdict(lambda: {"is_source": False, "is_swapper": False, "swap_count": 0})
+    swap_count = Counter()
+    buy_count = Counter()
+    sell_count = Counter()
 
     # Identify Sources & Swappers, Collect Swap Actions
     logger.info("=== Identifying source addresses from initial transfers ===")
-    initial_transfers = df[(df['event_type'] == 'Transfer') & (df['from_address'] == '0x0000000000000000000000000000000000000000')]
-    logger.info(f"Found {len(initial_transfers)} initial transfer events")
+    logger.info(f"Found {len(events['initial_transfer_recipients'])} initial transfer events")
     
-    for idx, row in initial_transfers.iterrows():
-        recipient = row['to_address']
-        if recipient and recipient != 'nan' and recipient not in excluded_addresses:
+    for recipient in events["initial_transfer_recipients"]:
+        if recipient not in skipped_addresses:
             source_addresses.add(recipient)
-            address_attributes[recipient]['is_source'] = True
             if recipient not in G: G.add_node(recipient, type='source')
-            logger.debug(f"Added source address from initial transfer: {recipient}")
+            logger.debug("Added source address from initial transfer: %s", recipient)
 
     logger.info(f"Found {len(source_addresses)} source addresses from initial transfers")
 
     logger.info("=== Identifying source addresses from Mint events ===")
-    mint_events = df[df['event_type'] == 'Mint']
-    logger.info(f"Found {len(mint_events)} mint events")
+    logger.info(f"Found {len(events['minters'])} mint events")
     
-    for idx, row in mint_events.iterrows():
-        minter = row['initiators']
-        if minter and minter != 'nan' and minter not in excluded_addresses:
+    for minter in events["minters"]:
+        if minter not in skipped_addresses:
             was_new_source = minter not in source_addresses
             source_addresses.add(minter)
-            address_attributes[minter]['is_source'] = True
             if minter not in G: G.add_node(minter, type='source')
-            logger.debug(f"Added source address from mint event: {minter} (new: {was_new_source})")
+            logger.debug("Added source address from mint event: %s (new: %s)", minter, was_new_source)
             
     logger.info(f"Total source addresses after mint events: {len(source_addresses)}")
-    logger.info(f"All source addresses: {sorted(list(source_addresses))}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("All source addresses: %s", sorted(source_addresses))
     
     logger.info("=== Identifying swappers from V2_Swap events ===")
-    v2_swaps_df = df[df['event_type'] == 'V2_Swap']
-    logger.info(f"Found {len(v2_swaps_df)} V2_Swap events")
+    logger.info(f"Found {len(events['swaps'])} V2_Swap events")
+    # Valid initiators per (block, type, value), in first-seen order, for coordinated swap detection
+    swap_groups = defaultdict(dict)
     
-    for idx, row in v2_swaps_df.iterrows():
-        initiator = row['initiators']
-        if initiator and initiator != 'nan' and initiator not in excluded_addresses:
+    for initiator, block, tx_type, value in events["swaps"]:
+        if initiator not in skipped_addresses:
             all_swappers.add(initiator) # Collect all valid swappers
-            address_attributes[initiator]['is_swapper'] = True
-            address_attributes[initiator]['swap_count'] += 1
+            swap_count[initiator] += 1
+            if tx_type == "BUY":
+                buy_count[initiator] += 1
+            elif tx_type == "SELL":
+                sell_count[initiator] += 1
             if initiator not in G: G.add_node(initiator, type='swapper')
-            address_swap_actions[initiator].append({
-                "block": row['block_number'], "type": row['transaction_type'], "value": row['value_formatted']
-            })
-            logger.debug(f"Processed swap by {initiator}: {row['transaction_type']} of {row['value_formatted']} at block {row['block_number']}")
+            if tx_type and value == value: # Rows with a missing type or NaN value never form a group
+                swap_groups[(block, tx_type, value)][initiator] = None
+            logger.debug("Processed swap by %s: %s of %s at block %s", initiator, tx_type, value, block)
 
     logger.info(f"Found {len(all_swappers)} unique swapper addresses (candidates for active traders)")
     
-    swap_counts = {addr: attrs['swap_count'] for addr, attrs in address_attributes.items() if attrs['swap_count'] > 0}
-    logger.info(f"Swap count distribution (top 10): {dict(sorted(swap_counts.items(), key=lambda x: x[1], reverse=True)[:10])}")
+    logger.info(f"Swap count distribution (top 10): {dict(swap_count.most_common(10))}")
 
     # --- 2. Graph Construction - Add Edges ---
     logger.info("=== Starting graph construction ===")
     logger.info(f"Current graph stats - Nodes: {G.number_of_nodes()}, Edges: {G.number_of_edges()}")
     
     logger.info("Adding source funding edges from Transfer events...")
-    transfers_df = df[df['event_type'] == 'Transfer'] # This will be used later too
+    # One edge per address pair, in first-seen order, carrying the block of the pair's last transfer
+    source_funding_blocks = {}
     source_funding_edges = 0
-    
-    for idx, row in transfers_df.iterrows():
-        from_addr, to_addr = row['from_address'], row['to_address']
-        if from_addr in source_addresses and to_addr and to_addr != 'nan' and to_addr not in excluded_addresses and from_addr != to_addr:
-            if from_addr not in G: G.add_node(from_addr)
-            if to_addr not in G: G.add_node(to_addr)
-            G.add_edge(from_addr, to_addr, weight=5.0, type='source_funding', block=row['block_number'])
+    for from_addr, to_addr, value, block in events["transfers"]:
+        if from_addr in source_addresses and to_addr not in skipped_addresses and from_addr != to_addr:
+            source_funding_blocks[(min(from_addr, to_addr), max(from_addr, to_addr))] = block
             source_funding_edges += 1
-            logger.debug(f"Added source funding edge: {from_addr} -> {to_addr} at block {row['block_number']}")
+    G.add_edges_from(
+        (addr1, addr2, {"weight": 5.0, "type": 'source_funding', "block": block})
+        for (addr1, addr2), block in source_funding_blocks.items()
+    )
 
-    logger.info(f"Added {source_funding_edges} source funding edges")
+    logger.info(f"Added {source_funding_edges} source funding edges ({len(source_funding_blocks)} unique pairs)")
 
     logger.info("Adding coordinated swap edges...")
-    grouped_swaps = v2_swaps_df.groupby(['block_number', 'transaction_type', 'value_formatted'])
     coordinated_swap_edges = 0
+    # Pairs seen in several coordinated groups get one edge with the summed weight;
+    # block/action_details keep the last group seen, as repeated add_edge calls did.
+    # Pairs are keyed unordered but inserted in first-seen order and orientation, since
+    # seeded best_partition depends on adjacency order
+    coordinated_edge_weights = Counter()
+    coordinated_edge_details = {}
+    coordinated_edge_ends = {}
     
-    for group_key, group_df in grouped_swaps:
-        block, tx_type, val = group_key
-        unique_initiators_in_group = group_df['initiators'].dropna().unique()
-        valid_initiators = [i for i in unique_initiators_in_group if i and i != 'nan' and i not in excluded_addresses]
+    for (block, tx_type, val), group_initiators in sorted(swap_groups.items()): # Same key order as a groupby
+        valid_initiators = list(group_initiators)
         
         if len(valid_initiators) > 1:
-            logger.debug(f"Found coordinated swap group at block {block}: {len(valid_initiators)} initiators doing {tx_type} of {val}")
-            for i in range(len(valid_initiators)):
-                for j in range(i + 1, len(valid_initiators)):
-                    addr1, addr2 = valid_initiators[i], valid_initiators[j]
-                    if addr1 not in G: G.add_node(addr1)
-                    if addr2 not in G: G.add_node(addr2)
-                    G.add_edge(addr1, addr2, weight=10.0, type='coordinated_swap', block=block, action_details=f"{tx_type}_{val}")
-                    coordinated_swap_edges += 1
-                    logger.debug(f"Added coordinated swap edge: {addr1} <-> {addr2}")
-
-    logger.info(f"Added {coordinated_swap_edges} coordinated swap edges")
+            logger.debug("Found coordinated swap group at block %s: %d initiators doing %s of %s", block, len(valid_initiators), tx_type, val)
+            for addr1, addr2 in combinations(valid_initiators, 2):
+                key = (addr1, addr2) if addr1 < addr2 else (addr2, addr1)
+                coordinated_edge_ends.setdefault(key, (addr1, addr2))
+                coordinated_edge_weights[key] += 10.0
+                coordinated_edge_details[key] = (block, f"{tx_type}_{val}")
+                coordinated_swap_edges += 1
+
+    G.add_edges_from(
+        (*coordinated_edge_ends[key], {"weight": weight, "type": 'coordinated_swap', "block": coordinated_edge_details[key][0], "action_details": coordinated_edge_details[key][1]})
+        for key, weight in coordinated_edge_weights.items()
+    )
+    logger.info(f"Added {coordinated_swap_edges} coordinated swap edges ({len(coordinated_edge_weights)} unique pairs)")
+    # Sources and the endpoints of their funding edges; a coordinated swap edge between the
+    # same pair replaces the funding edge's type, so those endpoints are not counted
+    source_linked_addresses = source_addresses.union(*(
+        pair for pair in source_funding_blocks if pair not in coordinated_edge_weights
+    ))
     logger.info(f"Final graph stats - Nodes: {G.number_of_nodes()}, Edges: {G.number_of_edges()}")
 
     logger.info("=== Graph structure analysis ===")
@@ -172,8 +366,15 @@ def analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, p
             return {"message": "Graph has no nodes or edges, and no source addresses were identified; cannot perform community detection.", "confidence_level": "None"}
     else: # Graph has nodes and edges, proceed with community detection
         try:
-            logger.info("Running Louvain community detection...")
-            partition = best_partition(G, weight='weight', random_state=42)
+            components = list(nx.connected_components(G))
+            if max(len(component) for component in components) <= 2:
+                # Louvain can only return the components themselves here, so skip it
+                logger.info("All connected components have at most 2 nodes; using them as communities")
+                component_ids = {node: idx for idx, component in enumerate(components) for node in component}
+                partition = {node: component_ids[node] for node in G}
+            else:
+                logger.info("Running Louvain community detection...")
+                partition = best_partition(G, weight='weight', random_state=42)
             logger.info(f"Community detection completed. Found partition with {len(set(partition.values()))} communities")
             
             clusters_raw = defaultdict(list)
@@ -183,7 +384,7 @@ def analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, p
             
             logger.info(f"Communities found: {len(communities)}")
             for i, community in enumerate(communities):
-                logger.debug(f"Community {i}: {len(community)} members - {sorted(community)}")
+                logger.debug("Community %d: %d members", i, len(community))
                 
         except Exception as e:
             logger.error(f"Community detection failed: {e}")
@@ -206,108 +407,37 @@ def analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, p
         best_cluster_info_trading = None 
         max_score = -1
 
-        for i, cluster_addresses_list in enumerate(communities): # Ensure it's a list for G.subgraph
-            if not cluster_addresses_list: continue
-            
-            logger.info(f"--- Analyzing Community {i} with {len(cluster_addresses_list)} members ---")
-            logger.debug(f"Community {i} members: {sorted(cluster_addresses_list)}")
-
-            current_score = 0
-            reasoning_parts_trading = [] # Use a distinct name
-            
-            num_members = len(cluster_addresses_list)
-            # G.edges requires nodes to be in G. For subgraph, nodes are inherently from G.
-            cluster_is_source_linked = any(address_attributes[addr]['is_source'] for addr in cluster_addresses_list) or \
-                                    any(any(data['type'] == 'source_funding' for u,v,data in G.edges(addr, data=True)) for addr in cluster_addresses_list if addr in G)
-
-
-            logger.debug(f"Community {i} - Source linked: {cluster_is_source_linked}")
-
-            total_buys = 0
-            total_sells = 0
-            coordinated_swap_participation_count = 0
-            
-            # Ensure all addresses in cluster_addresses_list are in G before creating subgraph
-            valid_subgraph_nodes = [addr for addr in cluster_addresses_list if addr in G]
-            if not valid_subgraph_nodes:
-                 logger.debug(f"Community {i} - No members found in graph G, skipping subgraph analysis.")
-            else:
-                subgraph = G.subgraph(valid_subgraph_nodes)
-                for u, v, data in subgraph.edges(data=True):
-                    if data.get('type') == 'coordinated_swap':
-                        coordinated_swap_participation_count += 1
-                        logger.debug(f"Community {i} - Coordinated swap edge: {u} <-> {v} ({data.get('action_details', 'N/A')})")
-            
-            logger.debug(f"Community {i} - Coordinated swap edges: {coordinated_swap_participation_count}")
-            
-            if coordinated_swap_participation_count > 0:
-                score_addition = num_members * 2 + coordinated_swap_participation_count * 2.5
-                current_score += score_addition
-                reasoning_parts_trading.append(f"{num_members} addresses show {coordinated_swap_participation_count} internal links from same-block-identical-value swaps.")
-                logger.debug(f"Community {i} - Added {score_addition} points for coordinated swaps")
-
-            for addr in cluster_addresses_list:
-                addr_buys = addr_sells = 0
-                for swap in address_swap_actions.get(addr, []):
-                    if swap["type"] == "BUY": 
-                        total_buys += 1; addr_buys += 1
-                    elif swap["type"] == "SELL": 
-                        total_sells += 1; addr_sells += 1
-                if addr_buys > 0 or addr_sells > 0:
-                    logger.debug(f"Community {i} - Address {addr}: {addr_buys} buys, {addr_sells} sells")
-            
-            logger.debug(f"Community {i} - Total: {total_buys} buys, {total_sells} sells")
-            
-            if total_buys > 0 and total_sells > 0:
-                current_score += 3
-                reasoning_parts_trading.append(f"Cluster members performed {total_buys} BUYs and {total_sells} SELLs.")
-                logger.debug(f"Community {i} - Added 3 points for having both buys and sells")
-                
-                has_coord_buys = False
-                if valid_subgraph_nodes: # only check subgraph if it was created
-                    subgraph_check = G.subgraph(valid_subgraph_nodes) # re-subgraph if needed, or pass 'subgraph'
-                    has_coord_buys = any(data.get('action_details','').startswith("BUY") for u,v,data in subgraph_check.edges(data=True) if data.get('type') == 'coordinated_swap')
-
-                if has_coord_buys and total_sells > 0:
-                    current_score += 2.5
-                    reasoning_parts_trading.append("Evidence of coordinated BUYs followed by SELLs by cluster members.")
-                    logger.debug(f"Community {i} - Added 2.5 points for coordinated buys followed by sells")
-            elif total_buys > 0 or total_sells > 0:
-                current_score += 1
-                reasoning_parts_trading.append(f"Cluster members performed {total_buys} BUYs and {total_sells} SELLs (predominantly one-sided).")
-                logger.debug(f"Community {i} - Added 1 point for one-sided trading")
-
-            if cluster_is_source_linked:
-                current_score += 1.5
-                reasoning_parts_trading.append("Cluster is linked to initial token source/minter.")
-                logger.debug(f"Community {i} - Added 1.5 points for source linkage")
-
-            if num_members == 1 and address_attributes[cluster_addresses_list[0]]['swap_count'] > 4 and total_buys > 1 and total_sells > 1:
-                current_score += 2 
-                reasoning_parts_trading.append("Single address with significant buy/sell activity, potential self-wash trading.")
-                logger.debug(f"Community {i} - Added 2 points for potential wash trading")
-
-            logger.info(f"Community {i} final score: {current_score}")
-            logger.debug(f"Community {i} reasoning: {' '.join(reasoning_parts_trading) if reasoning_parts_trading else 'No specific reasoning'}")
-
-            if current_score > max_score :
-                max_score = current_score
+        stats = _community_stats(communities, G, source_linked_addresses, swap_count, buy_count, sell_count)
+        # Largest communities first; skip any whose best possible score cannot beat the current max.
+        # Ties go to the lower community index, as with a plain in-order scan.
+        best_idx = None
+        for i in sorted(range(len(communities)), key=lambda idx: stats["num_members"][idx], reverse=True):
+            upper_bound = stats["num_members"][i] * 2 + stats["coordinated_edges"][i] * 2.5 + 3 + 2.5 + 1.5 + 2
+            if upper_bound < max_score or (upper_bound == max_score and i > best_idx):
+                continue
+            score, _ = _evaluate_community(stats, i)
+            logger.debug("Community %d (%d members) score: %s", i, stats['num_members'][i], score)
+            if score > max_score or (score == max_score and i < best_idx):
+                max_score, best_idx = score, i
+
+        if best_idx is not None:
+            if max_score > 0:
                 confidence_trading = "Low" # distinct name
                 if max_score >= 9: confidence_trading = "High"
                 elif max_score >= 5: confidence_trading = "Medium"
-                
-                logger.info(f"Community {i} is now the best cluster with score {current_score}")
-                
-                if max_score > 0:
-                    best_cluster_info_trading = {
-                        "addresses": list(cluster_addresses_list), 
-                        "confidence_level": confidence_trading,
-                        "reasoning": " ".join(reasoning_parts_trading) if reasoning_parts_trading else "Cluster identified based on trading activity and internal links."
-                    }
+
+                _, reasoning_parts_trading = _evaluate_community(stats, best_idx, with_reasoning=True)
+                logger.info(f"Community {best_idx} is the best cluster with score {max_score}")
+                best_cluster_info_trading = {
+                    "addresses": list(communities[best_idx]), 
+                    "confidence_level": confidence_trading,
+                    "reasoning": " ".join(reasoning_parts_trading) if reasoning_parts_trading else "Cluster identified based on trading activity and internal links."
+                }
         
         logger.info(f"Best trading cluster found with max score: {max_score}")
         if best_cluster_info_trading:
-            logger.info(f"Best trading cluster: {sorted(best_cluster_info_trading['addresses'])}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Best trading cluster: %s", sorted(best_cluster_info_trading['addresses']))
             logger.info(f"Best trading cluster confidence: {best_cluster_info_trading['confidence_level']}")
         
         # --- 5. Consolidate Owner's Cluster (Trading Cluster + All Source Addresses) ---
@@ -330,7 +460,9 @@ def analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, p
             if missing_sources:
                 final_cluster_addresses_set.update(missing_sources)
                 final_reasoning_parts_list.append(f"All identified source addresses ({len(missing_sources)} unique) included in the owner's cluster.")
-                logger.info(f"Added {len(missing_sources)} missing source addresses: {sorted(list(missing_sources))}")
+                logger.info("Added %d missing source addresses", len(missing_sources))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Missing source addresses: %s", sorted(missing_sources))
             elif best_cluster_info_trading: # Only log if there was a trading cluster to begin with
                 logger.info("All source addresses were already included in the trading cluster or no new sources to add.")
             
@@ -372,7 +504,7 @@ def analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, p
         
     logger.info("=== Final results for Owner's Cluster ===")
     logger.info(f"Owner's cluster size: {len(main_result['addresses'])}")
-    logger.info(f"Owner's cluster addresses: {main_result['addresses']}")
+    logger.debug("Owner's cluster addresses: %s", main_result['addresses'])
     logger.info(f"Owner's confidence level: {main_result['confidence_level']}")
     logger.info(f"Owner's reasoning: {main_result['reasoning']}")
 
@@ -384,7 +516,7 @@ def analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, p
     swapper_counts_list = [] # Use a distinct name
     for addr in all_swappers: 
         if addr not in owner_cluster_set: # Exclude those already in the owner's cluster
-            swapper_counts_list.append((addr, address_attributes[addr]['swap_count']))
+            swapper_counts_list.append((addr, swap_count[addr]))
     
     sorted_swappers_list = sorted(swapper_counts_list, key=lambda x: x[1], reverse=True)
     
@@ -396,46 +528,53 @@ def analyze_rugpuller_cluster(data_string: str, token_address_to_exclude: str, p
     else:
         logger.info(f"Top {len(top_active_traders_list)} active traders (not in owner's cluster):")
         for i, addr in enumerate(top_active_traders_list):
-            logger.info(f"  {i+1}. Address: {addr}, Swap Count: {address_attributes[addr]['swap_count']}")
+            logger.info(f"  {i+1}. Address: {addr}, Swap Count: {swap_count[addr]}")
+
+        # Index the transfers touching the top traders in one pass instead of rescanning them per trader
+        top_traders_set = set(top_active_traders_list)
+        transfers_to_trader = defaultdict(list)
+        transfers_from_trader = defaultdict(list)
+        for from_a, to_a, value, block in events["transfers"]:
+            if to_a in top_traders_set:
+                transfers_to_trader[to_a].append((from_a, value, block))
+            if from_a in top_traders_set:
+                transfers_from_trader[from_a].append((to_a, value, block))
 
         for active_trader_addr in top_active_traders_list:
             trader_links_info = { # Use a distinct name
                 "address": active_trader_addr,
-                "swap_count": address_attributes[active_trader_addr]['swap_count'],
+                "swap_count": swap_count[active_trader_addr],
                 "funded_by_owner_cluster": [],
                 "funded_owner_cluster": [],
                 "coordinated_swap_with_owner_cluster": []
             }
             logger.info(f"--- Analyzing links for active trader: {active_trader_addr} ---")
 
-            for _, row in transfers_df.iterrows(): # Using the transfers_df from earlier
-                from_a, to_a = row['from_address'], row['to_address']
-                value, block = row['value_formatted'], row['block_number']
-                
-                if from_a in owner_cluster_set and to_a == active_trader_addr:
+            for from_a, value, block in transfers_to_trader.get(active_trader_addr, ()):
+                if from_a in owner_cluster_set:
                     link_detail = {"from": from_a, "value": value, "block": block}
                     trader_links_info["funded_by_owner_cluster"].append(link_detail)
                     logger.info(f"Link: {active_trader_addr} funded by owner's cluster member {from_a} (Value: {value}, Block: {block})")
                 
-                if from_a == active_trader_addr and to_a in owner_cluster_set:
+            for to_a, value, block in transfers_from_trader.get(active_trader_addr, ()):
+                if to_a in owner_cluster_set:
                     link_detail = {"to": to_a, "value": value, "block": block}
                     trader_links_info["funded_owner_cluster"].append(link_detail)
                     logger.info(f"Link: {active_trader_addr} funded owner's cluster member {to_a} (Value: {value}, Block: {block})")
 
             if active_trader_addr in G: 
-                for owner_member_addr in owner_cluster_set:
-                    if owner_member_addr in G and G.has_edge(active_trader_addr, owner_member_addr):
-                        edge_data = G.edges[active_trader_addr, owner_member_addr]
-                        if edge_data.get('type') == 'coordinated_swap':
-                            link_detail = {
-                                "with_member": owner_member_addr,
-                                "block": edge_data.get('block'),
-                                "action_details": edge_data.get('action_details')
-                            }
-                            trader_links_info["coordinated_swap_with_owner_cluster"].append(link_detail)
-                            logger.info(f"Link: {active_trader_addr} had coordinated swap with {owner_member_addr} (Block: {link_detail['block']}, Action: {link_detail['action_details']})")
+                # Walk the trader's neighbours rather than probing every owner cluster member
+                for owner_member_addr, edge_data in G[active_trader_addr].items():
+                    if owner_member_addr in owner_cluster_set and edge_data.get('type') == 'coordinated_swap':
+                        link_detail = {
+                            "with_member": owner_member_addr,
+                            "block": edge_data.get('block'),
+                            "action_details": edge_data.get('action_details')
+                        }
+                        trader_links_info["coordinated_swap_with_owner_cluster"].append(link_detail)
+                        logger.info(f"Link: {active_trader_addr} had coordinated swap with {owner_member_addr} (Block: {link_detail['block']}, Action: {link_detail['action_details']})")
             else:
-                logger.debug(f"Active trader {active_trader_addr} not found in graph G, skipping graph-based link checks for it.")
+                logger.debug("Active trader %s not found in graph G, skipping graph-based link checks for it.", active_trader_addr)
             
             active_trader_analysis_results.append(trader_links_info)
 
@@ -468,4 +607,4 @@ if __name__ == '__main__':
     
     result = analyze_rugpuller_cluster(example_data_string, token_to_exclude, pair_to_exclude)
     
-    print(json.dumps(result, indent=2))
\ No newline at end of file
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
\ No newline at end of file
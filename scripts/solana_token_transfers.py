@@ -1,12 +1,29 @@
 import os
-import requests
+import asyncio
+import random
+import aiohttp
 import json
+import orjson
+from collections import OrderedDict
 from dotenv import load_dotenv
-from typing import List, Dict, Optional
+from typing import Any, AsyncIterator, List, Dict, Optional
 
 # Load environment variables from .env
 load_dotenv()
 
+# Rate-limit and transient gateway responses are retried before giving up
+RETRY_STATUSES = {429, 502, 503, 504}
+RETRY_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 0.2
+RETRY_MAX_DELAY_SECONDS = 30
+# Requests in flight per fetcher, so gathered calls stay under Alchemy's rate limit
+MAX_CONCURRENT_REQUESTS = 20
+# Transactions are immutable once confirmed, so fetched ones are kept per fetcher, least recently used evicted first
+TRANSACTION_CACHE_SIZE = 4096
+
+class InvalidJSONResponseError(aiohttp.ClientError):
+    """Raised when the RPC returns a body that is not valid JSON, so callers handle it like any other transport error."""
+
 class SolanaTokenTransferFetcher:
     def __init__(self):
         """Initialize the Solana token transfer fetcher with Alchemy API."""
@@ -20,12 +37,52 @@ class SolanaTokenTransferFetcher:
         self.headers = {
             'Content-Type': 'application/json',
         }
+        
+        self._transaction_cache = OrderedDict()
+        self._request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
     
-    def get_token_transfers(self, token_address: str, limit: int = 100, before: Optional[str] = None) -> Dict:
+    def _get_cached_transaction(self, signature: str) -> Optional[Dict]:
+        """Return a previously fetched transaction and mark it as recently used."""
+        if signature not in self._transaction_cache:
+            return None
+        self._transaction_cache.move_to_end(signature)
+        return self._transaction_cache[signature]
+    
+    def _cache_transaction(self, signature: str, transaction_data: Dict):
+        """Store a successfully fetched transaction; errors and missing transactions are not cached."""
+        if not isinstance(transaction_data, dict) or not transaction_data.get("result"):
+            return
+        self._transaction_cache[signature] = transaction_data
+        if len(self._transaction_cache) > TRANSACTION_CACHE_SIZE:
+            self._transaction_cache.popitem(last=False)
+    
+    async def _post_json(self, session: aiohttp.ClientSession, url: str, payload) -> Any:
+        """
+        POST a JSON-RPC payload and return the decoded response, retrying
+        rate-limit and transient gateway errors with jittered exponential backoff.
+        At most MAX_CONCURRENT_REQUESTS calls are in flight at once.
+        Bodies are encoded and decoded with orjson straight from bytes; an
+        undecodable body raises InvalidJSONResponseError.
+        """
+        body = orjson.dumps(payload)
+        for attempt in range(RETRY_ATTEMPTS):
+            async with self._request_semaphore:
+                async with session.post(url, headers=self.headers, data=body) as response:
+                    if response.status not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS - 1:
+                        response.raise_for_status()
+                        try:
+                            return orjson.loads(await response.read())
+                        except orjson.JSONDecodeError as e:
+                            raise InvalidJSONResponseError(f"Invalid JSON in RPC response: {e}") from e
+            # Back off after the connection and the semaphore slot have been released
+            await asyncio.sleep(min(RETRY_MAX_DELAY_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** attempt + random.random() * 0.1))
+    
+    async def get_token_transfers(self, session: aiohttp.ClientSession, token_address: str, limit: int = 100, before: Optional[str] = None) -> Dict:
         """
         Fetch token transfers for a specific token address.
         
         Args:
+            session (aiohttp.ClientSession): Shared HTTP session
             token_address (str): The token mint address on Solana
             limit (int): Maximum number of transfers to return (default: 100, max: 1000)
             before (str, optional): Signature to fetch transfers before (for pagination)
@@ -53,19 +110,18 @@ class SolanaTokenTransferFetcher:
         }
         
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()
+            return await self._post_json(session, url, payload)
             
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Error fetching token transfers: {e}")
             return {"error": str(e)}
     
-    def get_asset_transfers(self, token_address: str, limit: int = 100) -> Dict:
+    async def get_asset_transfers(self, session: aiohttp.ClientSession, token_address: str, limit: int = 100) -> Dict:
         """
         Get asset transfers using Alchemy's Enhanced API.
         
         Args:
+            session (aiohttp.ClientSession): Shared HTTP session
             token_address (str): The token mint address
             limit (int): Number of transfers to fetch
             
@@ -91,59 +147,101 @@ class SolanaTokenTransferFetcher:
         }
         
         try:
-            response = requests.post(enhanced_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()
+            return await self._post_json(session, enhanced_url, payload)
             
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Error fetching asset transfers: {e}")
             return {"error": str(e)}
     
-    def get_signatures_for_address(self, token_address: str, limit: int = 100) -> Dict:
+    async def get_signatures_for_address(self, session: aiohttp.ClientSession, token_address: str, limit: int = 100, before: Optional[str] = None) -> Dict:
         """
         Get transaction signatures for a token address.
         
         Args:
+            session (aiohttp.ClientSession): Shared HTTP session
             token_address (str): The token mint address
-            limit (int): Number of signatures to fetch
+            limit (int): Number of signatures to fetch (max: 1000)
+            before (str, optional): Signature to fetch signatures before (for pagination)
             
         Returns:
             Dict: Transaction signatures data
         """
         
+        options = {
+            "limit": limit,
+            "commitment": "confirmed"
+        }
+        if before:
+            options["before"] = before
+        
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
             "method": "getSignaturesForAddress",
             "params": [
                 token_address,
-                {
-                    "limit": limit,
-                    "commitment": "confirmed"
-                }
+                options
             ]
         }
         
         try:
-            response = requests.post(self.base_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()
+            return await self._post_json(session, self.base_url, payload)
             
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Error fetching signatures: {e}")
             return {"error": str(e)}
     
-    def parse_transaction_for_token_transfers(self, signature: str) -> Dict:
+    async def iter_signatures(self, session: aiohttp.ClientSession, token_address: str, limit: int, page_size: int = 1000) -> AsyncIterator[str]:
+        """
+        Yield up to `limit` transaction signatures for a token address, newest first.
+        
+        Pages through getSignaturesForAddress with `before`, so only one page of
+        signature entries is held in memory at a time.
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            token_address (str): The token mint address
+            limit (int): Total number of signatures to yield
+            page_size (int): Signatures requested per call (max: 1000)
+        """
+        
+        before = None
+        remaining = limit
+        while remaining > 0:
+            request_size = min(page_size, remaining)
+            response = await self.get_signatures_for_address(session, token_address, limit=request_size, before=before)
+            page = response.get("result")
+            if not page:
+                # Transport failures were already printed by get_signatures_for_address as a plain string;
+                # only JSON-RPC error objects from the node are reported here
+                if isinstance(response.get("error"), dict):
+                    print("Error fetching signatures:", response["error"])
+                return
+            
+            for entry in page:
+                yield entry["signature"]
+            
+            remaining -= len(page)
+            before = page[-1]["signature"]
+            if len(page) < request_size:
+                return
+    
+    async def parse_transaction_for_token_transfers(self, session: aiohttp.ClientSession, signature: str) -> Dict:
         """
         Parse a specific transaction to extract token transfer information.
         
         Args:
+            session (aiohttp.ClientSession): Shared HTTP session
             signature (str): Transaction signature
             
         Returns:
             Dict: Parsed transaction data
         """
         
+        cached = self._get_cached_transaction(signature)
+        if cached is not None:
+            return cached
+        
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -159,15 +257,68 @@ class SolanaTokenTransferFetcher:
         }
         
         try:
-            response = requests.post(self.base_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()
+            transaction_data = await self._post_json(session, self.base_url, payload)
+            self._cache_transaction(signature, transaction_data)
+            return transaction_data
             
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             print(f"Error fetching transaction: {e}")
             return {"error": str(e)}
 
-def main():
+    async def parse_transactions_batch(self, session: aiohttp.ClientSession, signatures: List[str]) -> List[Dict]:
+        """
+        Fetch several transactions with a single JSON-RPC batch request.
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            signatures (List[str]): Transaction signatures
+            
+        Returns:
+            List[Dict]: One getTransaction response per signature, in request order
+        """
+        
+        results = [self._get_cached_transaction(signature) for signature in signatures]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "getTransaction",
+                "params": [
+                    signatures[i],
+                    {
+                        "encoding": "jsonParsed",
+                        "maxSupportedTransactionVersion": 0,
+                        "commitment": "confirmed"
+                    }
+                ]
+            }
+            for i in missing
+        ]
+        
+        try:
+            data = await self._post_json(session, self.base_url, payload)
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching transactions batch: {e}")
+            data = {"error": str(e)}
+        
+        if isinstance(data, list):
+            # Batch responses may come back in any order; match them to requests by id
+            responses_by_id = {item.get("id"): item for item in data}
+        else:
+            # The whole batch was rejected, e.g. a rate limit error object
+            responses_by_id = {i: data for i in missing}
+        
+        for i in missing:
+            results[i] = responses_by_id.get(i, {"error": "Missing response in batch"})
+            self._cache_transaction(signatures[i], results[i])
+        return results
+
+async def main():
     """Main function to demonstrate usage."""
     try:
         # Initialize the fetcher
@@ -180,48 +331,49 @@ def main():
         print(f"Fetching token transfers for: {token_address}")
         print("-" * 60)
         
-        # Method 1: Get signatures for the token address
-        print("1. Fetching transaction signatures...")
-        signatures_response = fetcher.get_signatures_for_address(token_address, limit=10)
+        # One pooled session for every request
+        connector = aiohttp.TCPConnector(limit=64)
+        timeout = aiohttp.ClientTimeout(total=30)
         
-        if "result" in signatures_response:
-            signatures = signatures_response["result"]
-            print(f"Found {len(signatures)} recent transactions")
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            # Method 1: Get signatures for the token address
+            print("1. Fetching transaction signatures...")
+            # Only the first 3 are parsed for the demo, so stop paging once they are in hand
+            signatures = [signature async for signature in fetcher.iter_signatures(session, token_address, limit=3)]
             
-            # Parse first few transactions for token transfers
-            print("\n2. Parsing transactions for token transfers...")
-            for i, sig_info in enumerate(signatures[:3]):  # Limit to first 3 for demo
-                signature = sig_info["signature"]
-                print(f"\nTransaction {i+1}: {signature}")
+            if signatures:
+                print(f"Found {len(signatures)} recent transactions")
                 
-                transaction_data = fetcher.parse_transaction_for_token_transfers(signature)
+                # Parse the transactions for token transfers, fetched in one batch request
+                print("\n2. Parsing transactions for token transfers...")
+                results = await fetcher.parse_transactions_batch(session, signatures)
                 
-                if "result" in transaction_data and transaction_data["result"]:
-                    tx = transaction_data["result"]
-                    meta = tx.get("meta", {})
+                for i, (signature, transaction_data) in enumerate(zip(signatures, results)):
+                    print(f"\nTransaction {i+1}: {signature}")
                     
-                    # Check for token balance changes
-                    if "postTokenBalances" in meta and "preTokenBalances" in meta:
-                        pre_balances = {bal["accountIndex"]: bal for bal in meta["preTokenBalances"]}
-                        post_balances = {bal["accountIndex"]: bal for bal in meta["postTokenBalances"]}
+                    if "result" in transaction_data and transaction_data["result"]:
+                        tx = transaction_data["result"]
+                        meta = tx.get("meta", {})
                         
-                        print("  Token balance changes:")
-                        for account_index, post_bal in post_balances.items():
-                            pre_bal = pre_balances.get(account_index, {})
-                            pre_amount = int(pre_bal.get("uiTokenAmount", {}).get("amount", 0))
-                            post_amount = int(post_bal.get("uiTokenAmount", {}).get("amount", 0))
+                        # Check for token balance changes
+                        if "postTokenBalances" in meta and "preTokenBalances" in meta:
+                            # Only the pre-transaction amounts need an index; post balances are walked directly
+                            pre_amounts = {bal["accountIndex"]: int(bal.get("uiTokenAmount", {}).get("amount", 0)) for bal in meta["preTokenBalances"]}
                             
-                            if pre_amount != post_amount:
-                                change = post_amount - pre_amount
-                                decimals = post_bal.get("uiTokenAmount", {}).get("decimals", 0)
-                                ui_change = change / (10 ** decimals)
-                                print(f"    Account {post_bal.get('owner', 'Unknown')}: {ui_change:,.6f}")
-                
-                print("  Status:", "Success" if meta.get("err") is None else "Failed")
-                print("  Slot:", tx.get("slot", "Unknown"))
-                
-        else:
-            print("Error or no signatures found:", signatures_response)
+                            print("  Token balance changes:")
+                            for post_bal in meta["postTokenBalances"]:
+                                ui_amount = post_bal.get("uiTokenAmount", {})
+                                change = int(ui_amount.get("amount", 0)) - pre_amounts.get(post_bal["accountIndex"], 0)
+                                
+                                if change:
+                                    ui_change = change / (10 ** ui_amount.get("decimals", 0))
+                                    print(f"    Account {post_bal.get('owner', 'Unknown')}: {ui_change:,.6f}")
+                    
+                        print("  Status:", "Success" if meta.get("err") is None else "Failed")
+                        print("  Slot:", tx.get("slot", "Unknown"))
+                    
+            else:
+                print("No signatures found")
             
     except ValueError as e:
         print(f"Configuration Error: {e}")
@@ -230,4 +382,4 @@ def main():
         print(f"Unexpected error: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
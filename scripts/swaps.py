@@ -1,9 +1,14 @@
 import hypersync
 import asyncio
-from hypersync import BlockField, TransactionField, LogField, ClientConfig
+import numpy as np
+from hypersync import LogField, ClientConfig
 
 # returns all logs of swap events from a uniswap v3 pool within a block range and decodes them
 
+def topic_to_address(topic: str) -> str:
+    """Convert a 32-byte indexed address topic to a lowercase 0x-prefixed 20-byte address."""
+    return "0x" + topic[-40:].lower()
+
 async def main():
     # Create hypersync client using the ethereum mainnet hypersync endpoint (default)
     client = hypersync.HypersyncClient(ClientConfig())
@@ -27,10 +32,10 @@ async def main():
                 ]
             )
         ],
-        # Select the fields we are interested in
+        # Select only the log fields we read; block and transaction data (notably tx input) is never used
         field_selection=hypersync.FieldSelection(
-            block=[BlockField.NUMBER, BlockField.TIMESTAMP, BlockField.HASH],
             log=[
+                LogField.BLOCK_NUMBER,
                 LogField.LOG_INDEX,
                 LogField.TRANSACTION_INDEX,
                 LogField.TRANSACTION_HASH,
@@ -41,15 +46,6 @@ async def main():
                 LogField.TOPIC2,
                 LogField.TOPIC3,
             ],
-            transaction=[
-                TransactionField.BLOCK_NUMBER,
-                TransactionField.TRANSACTION_INDEX,
-                TransactionField.HASH,
-                TransactionField.FROM,
-                TransactionField.TO,
-                TransactionField.VALUE,
-                TransactionField.INPUT,
-            ],
         ),
     )
 
@@ -60,49 +56,45 @@ async def main():
 
     print("Running the query...")
 
-    # Run the query once, the query is automatically paginated so it will return when it reaches some limit (time, response size etc.)
-    # there is a next_block field on the response object so we can set the from_block of our query to this value and continue our query until
-    # res.next_block is equal to res.archive_height or query.to_block in case we specified an end block.
-    res = await client.get(query)
+    # Stream the query instead of fetching a single page: the client keeps requesting the next pages
+    # (advancing from_block to each response's next_block) while we decode the current one.
+    receiver = await client.stream(query, hypersync.StreamConfig())
 
-    print(f"Query returned {len(res.data.logs)} logs of swap events from contract {pool}")
+    total_logs = 0
+    # One tuple per decoded swap: (block, tx hash, sender, recipient, amount0, amount1, sqrtPriceX96, liquidity, tick)
+    # Indexed parameters are in topics (topics[0] is the event signature hash), non-indexed ones are in log.body
+    swap_rows = []
 
-    # Decode the logs
-    decoded_logs = await decoder.decode_logs(res.data.logs)
-    
-    # Process and display the decoded logs
-    for i, log in enumerate(decoded_logs):
-        if log is None:
-            print(f"Log {i}: Failed to decode")
-            continue
-        
-        # Get the corresponding raw log for additional info
-        raw_log = res.data.logs[i]
-        
-        # Debug: Print the structure of the decoded log
-        print(f"\nLog {i} debug info:")
-        print(f"  log.body length: {len(log.body) if log.body else 0}")
-        print(f"  raw_log topics: {raw_log.topics if hasattr(raw_log, 'topics') else 'No topics'}")
-        if log.body:
-            for j, param in enumerate(log.body):
-                print(f"  log.body[{j}]: {param.val if param else 'None'}")
-        
-        # Extract parameters correctly:
-        # Indexed parameters are in topics, non-indexed are in log.body
-        # topics[0] is the event signature hash, topics[1] is first indexed param, etc.
-        sender = raw_log.topics[1] if len(raw_log.topics) > 1 else "N/A"  # topic1 = sender (indexed)
-        recipient = raw_log.topics[2] if len(raw_log.topics) > 2 else "N/A"  # topic2 = recipient (indexed)
-        
-        # Non-indexed parameters are in log.body
-        amount0 = log.body[0].val if len(log.body) > 0 and log.body[0] else 0
-        amount1 = log.body[1].val if len(log.body) > 1 and log.body[1] else 0
-        sqrt_price_x96 = log.body[2].val if len(log.body) > 2 and log.body[2] else 0
-        liquidity = log.body[3].val if len(log.body) > 3 and log.body[3] else 0
-        tick = log.body[4].val if len(log.body) > 4 and log.body[4] else 0
-        
+    while True:
+        res = await receiver.recv()
+        # exit if the stream finished
+        if res is None:
+            break
+
+        total_logs += len(res.data.logs)
+
+        # Decode the logs on a background thread so we don't block the event loop
+        decoded_logs = await decoder.decode_logs(res.data.logs)
+        swap_rows.extend(
+            (raw_log.block_number, raw_log.transaction_hash, topic_to_address(raw_log.topics[1]), topic_to_address(raw_log.topics[2]),
+             log.body[0].val, log.body[1].val, log.body[2].val, log.body[3].val, log.body[4].val)
+            for raw_log, log in zip(res.data.logs, decoded_logs)
+            if log is not None
+        )
+
+        print(f"reached block {res.next_block}, {total_logs} logs of swap events from contract {pool} so far")
+
+    # Derive pool prices for all swaps at once: price = (sqrtPriceX96 / 2**96)**2, in raw token1 per token0.
+    # sqrtPriceX96 is a uint160, so it is held as float64 (amounts are int256 and stay Python ints).
+    sqrt_prices = np.fromiter((row[6] for row in swap_rows), dtype=np.float64, count=len(swap_rows))
+    prices = np.square(sqrt_prices / 2.0**96)
+    ticks = np.fromiter((row[8] for row in swap_rows), dtype=np.int32, count=len(swap_rows))
+
+    # Show the first few swap events for debugging
+    for i, (block, tx_hash, sender, recipient, amount0, amount1, sqrt_price_x96, liquidity, tick) in enumerate(swap_rows[:3]):
         print(f"\n--- Swap Event {i+1} ---")
-        print(f"Block: {raw_log.block_number}")
-        print(f"Transaction: {raw_log.transaction_hash}")
+        print(f"Block: {block}")
+        print(f"Transaction: {tx_hash}")
         print(f"Sender: {sender}")
         print(f"Recipient: {recipient}")
         print(f"Amount0: {amount0}")
@@ -110,12 +102,11 @@ async def main():
         print(f"SqrtPriceX96: {sqrt_price_x96}")
         print(f"Liquidity: {liquidity}")
         print(f"Tick: {tick}")
-        
-        # Stop after first few logs for debugging
-        if i >= 2:
-            print(f"\n... stopping after first {i+1} logs for debugging ...")
-            break
+        print(f"Price (token1/token0, raw units): {prices[i]}")
 
-    print(f"\nTotal processed: {len([log for log in decoded_logs if log is not None])} valid swap events")
+    print(f"\nTotal processed: {len(swap_rows)} valid swap events")
+    if len(swap_rows) > 0:
+        print(f"Price range (token1/token0, raw units): {prices.min()} - {prices.max()}")
+        print(f"Tick range: {ticks.min()} - {ticks.max()}")
 
 asyncio.run(main())
\ No newline at end of file
@@ -1,13 +1,14 @@
 import hypersync
 import asyncio
 import json
+import orjson
 import pandas as pd
 import os
 import aiohttp
 import networkx as nx
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from hypersync import BlockField, TransactionField, LogField, ClientConfig
+from hypersync import LogField, ClientConfig
 from typing import List, Dict, Any, Optional, Set, Tuple
 from collections import defaultdict, Counter
 import numpy as np
@@ -54,6 +55,35 @@ EVENT_SIGNATURES = {
     }
 }
 
+# topic0 lookups in both directions, built once at import
+EVENT_HASHES = {event_type: event["hash"] for event_type, event in EVENT_SIGNATURES.items()}
+EVENT_TYPES_BY_HASH = {event_hash: event_type for event_type, event_hash in EVENT_HASHES.items()}
+
+# Swap/Mint/Burn event types by pair version label; v4 pools use the V3 event layout
+PAIR_VERSION_EVENT_TYPES = {
+    "v2": ("V2_Swap", "V2_Mint", "V2_Burn"),
+    "v3": ("V3_Swap", "V3_Mint", "V3_Burn"),
+    "v4": ("V3_Swap", "V3_Mint", "V3_Burn"),
+}
+
+# Upper bound on HyperSync queries in flight at once
+MAX_CONCURRENT_QUERIES = 16
+
+# Decoders are stateless, so every analyzer shares one per event type
+DECODERS = {
+    event_type: hypersync.Decoder([event["signature"]])
+    for event_type, event in EVENT_SIGNATURES.items()
+}
+
+_client = None
+
+def get_client() -> hypersync.HypersyncClient:
+    """Return the process-wide HyperSync client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = hypersync.HypersyncClient(ClientConfig())
+    return _client
+
 class WashTradingDetector:
     """
     Advanced wash trading detection system that analyzes trading patterns
@@ -76,85 +106,85 @@ class WashTradingDetector:
         """Create a unified timeline of all transactions ordered by block number."""
 
         print("   🕐 Creating unified transaction timeline...")
-        timeline_data = []
+        timeline_data = defaultdict(list)
+
+        def add_events(df: pd.DataFrame, event_type: str, from_addresses, to_addresses, values,
+                       token_addresses, pair_addresses):
+            # Column-wise equivalent of appending one timeline row per event
+            n = len(df)
+            timeline_data['block_number'].extend(df['block_number'].tolist())
+            timeline_data['transaction_hash'].extend(df['transaction_hash'].tolist())
+            timeline_data['event_type'].extend([event_type] * n)
+            timeline_data['from_address'].extend(from_addresses)
+            timeline_data['to_address'].extend(to_addresses)
+            timeline_data['value'].extend(values)
+            timeline_data['token_address'].extend(token_addresses if token_addresses is not None else [None] * n)
+            timeline_data['pair_address'].extend(pair_addresses if pair_addresses is not None else [None] * n)
+            timeline_data['raw_data'].extend(df.to_dict('records'))
+
+        def column(df: pd.DataFrame, name: str, default=''):
+            return df[name].tolist() if name in df.columns else [default] * len(df)
+
+        def max_float(df: pd.DataFrame, names: List[str], absolute: bool = False) -> List[float]:
+            columns = [[abs(float(v)) if absolute else float(v) for v in column(df, name, 0)] for name in names]
+            return [max(values) for values in zip(*columns)]
 
         # Process Transfer events
         if not transfer_df.empty:
-            for _, row in transfer_df.iterrows():
-                timeline_data.append({
-                    'block_number': row['block_number'],
-                    'transaction_hash': row['transaction_hash'],
-                    'event_type': 'Transfer',
-                    'from_address': self.clean_address(row['from_address']),
-                    'to_address': self.clean_address(row['to_address']),
-                    'value': float(row['value']) if pd.notna(row['value']) else 0,
-                    'token_address': row.get('token_address', ''),
-                    'pair_address': None,
-                    'raw_data': row.to_dict()
-                })
+            add_events(
+                transfer_df, 'Transfer',
+                [self.clean_address(a) for a in transfer_df['from_address']],
+                [self.clean_address(a) for a in transfer_df['to_address']],
+                [float(v) if pd.notna(v) else 0 for v in transfer_df['value']],
+                column(transfer_df, 'token_address'),
+                None
+            )
 
         # Process V2 Swap events
         if not swap_v2_df.empty:
-            for _, row in swap_v2_df.iterrows():
-                timeline_data.append({
-                    'block_number': row['block_number'],
-                    'transaction_hash': row['transaction_hash'],
-                    'event_type': 'V2_Swap',
-                    'from_address': self.clean_address(row['sender']),
-                    'to_address': self.clean_address(row['to']),
-                    'value': max(float(row.get('amount0In', 0)), float(row.get('amount1In', 0)),
-                               float(row.get('amount0Out', 0)), float(row.get('amount1Out', 0))),
-                    'token_address': None,
-                    'pair_address': row.get('pair_address', ''),
-                    'raw_data': row.to_dict()
-                })
+            add_events(
+                swap_v2_df, 'V2_Swap',
+                [self.clean_address(a) for a in swap_v2_df['sender']],
+                [self.clean_address(a) for a in swap_v2_df['to']],
+                max_float(swap_v2_df, ['amount0In', 'amount1In', 'amount0Out', 'amount1Out']),
+                None,
+                column(swap_v2_df, 'pair_address')
+            )
 
         # Process V3 Swap events
         if not swap_v3_df.empty:
-            for _, row in swap_v3_df.iterrows():
-                timeline_data.append({
-                    'block_number': row['block_number'],
-                    'transaction_hash': row['transaction_hash'],
-                    'event_type': 'V3_Swap',
-                    'from_address': self.clean_address(row['sender']),
-                    'to_address': self.clean_address(row['recipient']),
-                    'value': max(abs(float(row.get('amount0', 0))), abs(float(row.get('amount1', 0)))),
-                    'token_address': None,
-                    'pair_address': row.get('pair_address', ''),
-                    'raw_data': row.to_dict()
-                })
+            add_events(
+                swap_v3_df, 'V3_Swap',
+                [self.clean_address(a) for a in swap_v3_df['sender']],
+                [self.clean_address(a) for a in swap_v3_df['recipient']],
+                max_float(swap_v3_df, ['amount0', 'amount1'], absolute=True),
+                None,
+                column(swap_v3_df, 'pair_address')
+            )
 
         # Process Mint events
         if not mint_df.empty:
-            for _, row in mint_df.iterrows():
-                from_addr = row.get('sender') or row.get('owner', '')
-                timeline_data.append({
-                    'block_number': row['block_number'],
-                    'transaction_hash': row['transaction_hash'],
-                    'event_type': 'Mint',
-                    'from_address': self.clean_address(from_addr),
-                    'to_address': row.get('pair_address', ''),
-                    'value': max(float(row.get('amount0', 0)), float(row.get('amount1', 0))),
-                    'token_address': None,
-                    'pair_address': row.get('pair_address', ''),
-                    'raw_data': row.to_dict()
-                })
+            from_addresses = [sender or owner for sender, owner in zip(column(mint_df, 'sender', None), column(mint_df, 'owner'))]
+            add_events(
+                mint_df, 'Mint',
+                [self.clean_address(a) for a in from_addresses],
+                column(mint_df, 'pair_address'),
+                max_float(mint_df, ['amount0', 'amount1']),
+                None,
+                column(mint_df, 'pair_address')
+            )
 
         # Process Burn events
         if not burn_df.empty:
-            for _, row in burn_df.iterrows():
-                to_addr = row.get('to') or row.get('owner', '')
-                timeline_data.append({
-                    'block_number': row['block_number'],
-                    'transaction_hash': row['transaction_hash'],
-                    'event_type': 'Burn',
-                    'from_address': row.get('pair_address', ''),
-                    'to_address': self.clean_address(to_addr),
-                    'value': max(float(row.get('amount0', 0)), float(row.get('amount1', 0))),
-                    'token_address': None,
-                    'pair_address': row.get('pair_address', ''),
-                    'raw_data': row.to_dict()
-                })
+            to_addresses = [to or owner for to, owner in zip(column(burn_df, 'to', None), column(burn_df, 'owner'))]
+            add_events(
+                burn_df, 'Burn',
+                column(burn_df, 'pair_address'),
+                [self.clean_address(a) for a in to_addresses],
+                max_float(burn_df, ['amount0', 'amount1']),
+                None,
+                column(burn_df, 'pair_address')
+            )
 
         # Create DataFrame and sort by block number
         timeline_df = pd.DataFrame(timeline_data)
@@ -1084,27 +1114,39 @@ class WashTradingDetector:
 
 class TokenAnalyticsExcel:
     def __init__(self, output_dir: str = "output", alchemy_api_key: Optional[str] = None):
-        self.client = hypersync.HypersyncClient(ClientConfig())
+        self.client = get_client()
+        self.query_semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
         self.output_dir = output_dir
         self.alchemy_api_key = alchemy_api_key or os.getenv('ALCHEMY_API_KEY')
         self.alchemy_base_url = f"https://eth-mainnet.g.alchemy.com/v2/{self.alchemy_api_key}" if self.alchemy_api_key else None
-        self.decoders = {
-            "Transfer": hypersync.Decoder([EVENT_SIGNATURES["Transfer"]["signature"]]),
-            "V2_Swap": hypersync.Decoder([EVENT_SIGNATURES["V2_Swap"]["signature"]]),
-            "V2_Mint": hypersync.Decoder([EVENT_SIGNATURES["V2_Mint"]["signature"]]),
-            "V2_Burn": hypersync.Decoder([EVENT_SIGNATURES["V2_Burn"]["signature"]]),
-            "V3_Swap": hypersync.Decoder([EVENT_SIGNATURES["V3_Swap"]["signature"]]),
-            "V3_Mint": hypersync.Decoder([EVENT_SIGNATURES["V3_Mint"]["signature"]]),
-            "V3_Burn": hypersync.Decoder([EVENT_SIGNATURES["V3_Burn"]["signature"]]),
-        }
+        self.decoders = DECODERS
 
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
 
     def load_token_data(self, filename: str) -> List[Dict]:
         """Load token data from JSON file."""
-        with open(filename, 'r') as f:
-            return json.load(f)
+        with open(filename, 'rb') as f:
+            return orjson.loads(f.read())
+
+    async def stream_logs(self, query: hypersync.Query) -> List[Any]:
+        """Stream a query page by page and return the logs of every page.
+
+        A single client.get only returns the first page of results, so long
+        histories have to be followed through the stream to the end.
+        """
+        logs = []
+        async with self.query_semaphore:
+            receiver = await self.client.stream(query, hypersync.StreamConfig())
+
+            while True:
+                res = await receiver.recv()
+                # exit if the stream finished
+                if res is None:
+                    break
+                logs.extend(res.data.logs)
+
+        return logs
 
     async def fetch_transfer_events(self, token_address: str, from_block: int = 0, to_block: Optional[int] = None) -> Dict[str, Any]:
         """Fetch ALL Transfer events for a specific token."""
@@ -1114,90 +1156,97 @@ class TokenAnalyticsExcel:
             logs=[
                 hypersync.LogSelection(
                     address=[token_address],
-                    topics=[[EVENT_SIGNATURES["Transfer"]["hash"]]]
+                    topics=[[EVENT_HASHES["Transfer"]]]
                 )
             ],
+            # Only the log columns the Transfer rows and decoder read
             field_selection=hypersync.FieldSelection(
-                block=[BlockField.NUMBER, BlockField.TIMESTAMP, BlockField.HASH],
                 log=[
                     LogField.LOG_INDEX,
-                    LogField.TRANSACTION_INDEX,
                     LogField.TRANSACTION_HASH,
                     LogField.DATA,
-                    LogField.ADDRESS,
                     LogField.TOPIC0,
                     LogField.TOPIC1,
                     LogField.TOPIC2,
-                    LogField.TOPIC3,
                     LogField.BLOCK_NUMBER,
                 ],
-                transaction=[
-                    TransactionField.BLOCK_NUMBER,
-                    TransactionField.TRANSACTION_INDEX,
-                    TransactionField.HASH,
-                    TransactionField.FROM,
-                    TransactionField.TO,
-                    TransactionField.VALUE,
-                ],
             ),
         )
 
         print(f"🔄 Fetching ALL Transfer events for token {token_address}...")
-        res = await self.client.get(query)
-        decoded_logs = await self.decoders["Transfer"].decode_logs(res.data.logs)
+        logs = await self.stream_logs(query)
+        decoded_logs = await self.decoders["Transfer"].decode_logs(logs)
 
         return {
             "token_address": token_address,
             "event_type": "Transfer",
-            "raw_logs": res.data.logs,
+            "raw_logs": logs,
             "decoded_logs": decoded_logs,
-            "count": len(res.data.logs)
+            "count": len(logs)
         }
 
     async def fetch_pair_events(self, pair_address: str, pair_version: str, from_block: int = 0, to_block: Optional[int] = None) -> Dict[str, Any]:
         """Fetch ALL Swap, Mint, and Burn events for a specific trading pair."""
+        results = await self.fetch_all_pairs_events([(pair_address, pair_version)], from_block, to_block)
+        return results[0]
 
-        # Validate pair address length
-        if len(pair_address) != 42:
-            print(f"⚠️  Invalid pair address length: {pair_address} (length: {len(pair_address)})")
-            return {
-                "pair_address": pair_address,
-                "pair_version": pair_version,
-                "error": f"Invalid address length: {len(pair_address)}, expected 42",
-                "events": {},
-                "total_logs": 0
-            }
+    def get_pair_event_types(self, pair_version: str) -> Tuple[str, ...]:
+        """Map a pair version label to the Swap/Mint/Burn event types it emits."""
+        version = pair_version.lower()
+        for version_key, event_types in PAIR_VERSION_EVENT_TYPES.items():
+            if version_key in version:
+                return event_types
 
-        # Determine event types based on version
-        if "v2" in pair_version.lower():
-            event_types = ["V2_Swap", "V2_Mint", "V2_Burn"]
-        elif "v3" in pair_version.lower():
-            event_types = ["V3_Swap", "V3_Mint", "V3_Burn"]
-        elif "v4" in pair_version.lower():
-            event_types = ["V3_Swap", "V3_Mint", "V3_Burn"]
-        else:
-            print(f"⚠️  Unknown pair version: {pair_version}, defaulting to V2")
-            event_types = ["V2_Swap", "V2_Mint", "V2_Burn"]
+        print(f"⚠️  Unknown pair version: {pair_version}, defaulting to V2")
+        return PAIR_VERSION_EVENT_TYPES["v2"]
 
-        # Create queries for all event types
-        log_selections = []
-        for event_type in event_types:
-            log_selections.append(
-                hypersync.LogSelection(
-                    address=[pair_address],
-                    topics=[[EVENT_SIGNATURES[event_type]["hash"]]]
-                )
-            )
+    async def fetch_all_pairs_events(self, pairs: List[Tuple[str, str]], from_block: int = 0, to_block: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Fetch ALL Swap, Mint, and Burn events for several pairs with a single query.
+
+        Returns one result per (pair_address, pair_version) in the order given,
+        each shaped like fetch_pair_events output.
+        """
+        results = [None] * len(pairs)
+        valid_pairs = []
+
+        for i, (pair_address, pair_version) in enumerate(pairs):
+            # Validate pair address length
+            if len(pair_address) != 42:
+                print(f"⚠️  Invalid pair address length: {pair_address} (length: {len(pair_address)})")
+                results[i] = {
+                    "pair_address": pair_address,
+                    "pair_version": pair_version,
+                    "error": f"Invalid address length: {len(pair_address)}, expected 42",
+                    "events": {},
+                    "total_logs": 0
+                }
+                continue
+            valid_pairs.append((i, pair_address, pair_version, self.get_pair_event_types(pair_version)))
+
+        if not valid_pairs:
+            return results
+
+        # One LogSelection per event type, covering every pair that emits it
+        addresses_by_type = defaultdict(list)
+        for _, pair_address, _, event_types in valid_pairs:
+            for event_type in event_types:
+                addresses_by_type[event_type].append(pair_address)
 
         query = hypersync.Query(
             from_block=from_block,
             to_block=to_block,
-            logs=log_selections,
+            logs=[
+                hypersync.LogSelection(
+                    address=addresses,
+                    topics=[[EVENT_HASHES[event_type]]]
+                )
+                for event_type, addresses in addresses_by_type.items()
+            ],
+            # Only the log columns the pair rows and decoders read; ADDRESS buckets logs per pair,
+            # TOPIC3 carries the V3 Mint/Burn tickUpper
             field_selection=hypersync.FieldSelection(
-                block=[BlockField.NUMBER, BlockField.TIMESTAMP, BlockField.HASH],
                 log=[
                     LogField.LOG_INDEX,
-                    LogField.TRANSACTION_INDEX,
                     LogField.TRANSACTION_HASH,
                     LogField.DATA,
                     LogField.ADDRESS,
@@ -1207,195 +1256,203 @@ class TokenAnalyticsExcel:
                     LogField.TOPIC3,
                     LogField.BLOCK_NUMBER,
                 ],
-                transaction=[
-                    TransactionField.BLOCK_NUMBER,
-                    TransactionField.TRANSACTION_INDEX,
-                    TransactionField.HASH,
-                    TransactionField.FROM,
-                    TransactionField.TO,
-                    TransactionField.VALUE,
-                ],
             ),
         )
 
-        print(f"🔄 Fetching ALL pair events for {pair_version} pair {pair_address}...")
-        res = await self.client.get(query)
+        print(f"🔄 Fetching ALL pair events for {len(valid_pairs)} pairs...")
+        logs = await self.stream_logs(query)
 
-        # Separate and decode logs by event type
-        events_by_type = {}
-        for event_type in event_types:
-            event_hash = EVENT_SIGNATURES[event_type]["hash"]
-            filtered_logs = [log for log in res.data.logs if log.topics and log.topics[0] == event_hash]
-
-            if filtered_logs:
-                decoded_logs = await self.decoders[event_type].decode_logs(filtered_logs)
-                events_by_type[event_type] = {
+        # Bucket logs by (pair, event type) in a single pass
+        buckets = {
+            (pair_address.lower(), event_type): []
+            for _, pair_address, _, event_types in valid_pairs
+            for event_type in event_types
+        }
+        for log in logs:
+            if not log.topics or not log.address:
+                continue
+            bucket = buckets.get((log.address.lower(), EVENT_TYPES_BY_HASH.get(log.topics[0])))
+            if bucket is not None:
+                bucket.append(log)
+
+        # Decode each event type once across all pairs
+        filtered_by_type = defaultdict(list)
+        for i, pair_address, _, event_types in valid_pairs:
+            for event_type in event_types:
+                filtered_by_type[event_type].append((i, buckets[(pair_address.lower(), event_type)]))
+
+        events_by_pair = defaultdict(dict)
+        for event_type, pair_logs in filtered_by_type.items():
+            all_logs = [log for _, filtered_logs in pair_logs for log in filtered_logs]
+            decoded_logs = await self.decoders[event_type].decode_logs(all_logs) if all_logs else []
+
+            offset = 0
+            for i, filtered_logs in pair_logs:
+                count = len(filtered_logs)
+                events_by_pair[i][event_type] = {
                     "raw_logs": filtered_logs,
-                    "decoded_logs": decoded_logs,
-                    "count": len(filtered_logs)
-                }
-            else:
-                events_by_type[event_type] = {
-                    "raw_logs": [],
-                    "decoded_logs": [],
-                    "count": 0
+                    "decoded_logs": decoded_logs[offset:offset + count],
+                    "count": count
                 }
+                offset += count
 
-        return {
-            "pair_address": pair_address,
-            "pair_version": pair_version,
-            "events": events_by_type,
-            "total_logs": len(res.data.logs)
-        }
+        for i, pair_address, pair_version, _ in valid_pairs:
+            results[i] = {
+                "pair_address": pair_address,
+                "pair_version": pair_version,
+                "events": events_by_pair[i],
+                "total_logs": sum(event["count"] for event in events_by_pair[i].values())
+            }
+
+        return results
+
+    def topic_column(self, topics: List[List[str]], index: int, default: Any = "N/A") -> List[Any]:
+        """Pull one topic position out of every log, with a default for logs that lack it."""
+        return [log_topics[index] if len(log_topics) > index else default for log_topics in topics]
+
+    def body_column(self, bodies: List[List[Any]], index: int, default: Any = 0) -> List[Any]:
+        """Pull one decoded body value out of every log, with a default for logs that lack it."""
+        return [body[index].val if len(body) > index else default for body in bodies]
+
+    def tick_column(self, topics: List[List[str]], index: int) -> np.ndarray:
+        """Decode an indexed int24 tick from every log; logs without it get 0.
+
+        Only the low 3 bytes of the 32-byte topic carry the tick, so each one is
+        padded to a big-endian uint32, parsed in one frombuffer call and
+        sign-extended from 24 bits.
+        """
+        tick_hex = "".join("00" + (log_topics[index][-6:] if len(log_topics) > index else "000000") for log_topics in topics)
+        raw = np.frombuffer(bytes.fromhex(tick_hex), dtype=">u4").astype(np.int32)
+        return ((raw << 8) >> 8).astype(np.int64)
 
     def process_transfer_events(self, transfer_results: Dict[str, Any]) -> pd.DataFrame:
         """Convert transfer events to pandas DataFrame."""
-        transfers_data = []
-
-        if transfer_results.get("raw_logs") and transfer_results.get("decoded_logs"):
-            for raw_log, decoded_log in zip(transfer_results["raw_logs"], transfer_results["decoded_logs"]):
-                if decoded_log is None:
-                    continue
-
-                from_address = raw_log.topics[1] if len(raw_log.topics) > 1 else "N/A"
-                to_address = raw_log.topics[2] if len(raw_log.topics) > 2 else "N/A"
-                value = decoded_log.body[0].val if len(decoded_log.body) > 0 and decoded_log.body[0] else 0
-
-                transfers_data.append({
-                    "block_number": raw_log.block_number,
-                    "transaction_hash": raw_log.transaction_hash,
-                    "from_address": from_address,
-                    "to_address": to_address,
-                    "value": value,
-                    "token_address": transfer_results["token_address"]
-                })
+        if not transfer_results.get("raw_logs") or not transfer_results.get("decoded_logs"):
+            return pd.DataFrame()
 
-        df = pd.DataFrame(transfers_data)
-        if not df.empty:
-            df = df.sort_values(['block_number', 'transaction_hash']).reset_index(drop=True)
+        # Extract each field for the whole batch at once instead of row by row
+        kept = [(raw_log, decoded_log.body) for raw_log, decoded_log in zip(transfer_results["raw_logs"], transfer_results["decoded_logs"]) if decoded_log is not None]
+        if not kept:
+            return pd.DataFrame()
+
+        raw_logs = [raw_log for raw_log, _ in kept]
+        topics = [raw_log.topics for raw_log in raw_logs]
+
+        df = pd.DataFrame({
+            "block_number": [raw_log.block_number for raw_log in raw_logs],
+            "transaction_hash": [raw_log.transaction_hash for raw_log in raw_logs],
+            "from_address": self.topic_column(topics, 1),
+            "to_address": self.topic_column(topics, 2),
+            "value": [body[0].val if len(body) > 0 and body[0] else 0 for _, body in kept],
+            "token_address": [transfer_results["token_address"]] * len(kept),
+        })
+        df = df.sort_values(['block_number', 'transaction_hash']).reset_index(drop=True)
         return df
 
     def process_swap_events(self, pair_results: Dict[str, Any], event_type: str) -> pd.DataFrame:
         """Convert swap events to pandas DataFrame."""
-        swaps_data = []
-
         if "events" not in pair_results or event_type not in pair_results["events"]:
-            return pd.DataFrame(swaps_data)
+            return pd.DataFrame()
 
         event_data = pair_results["events"][event_type]
         if not event_data.get("raw_logs") or not event_data.get("decoded_logs"):
-            return pd.DataFrame(swaps_data)
-
-        version = "V2" if "V2" in event_type else "V3"
+            return pd.DataFrame()
 
-        for raw_log, decoded_log in zip(event_data["raw_logs"], event_data["decoded_logs"]):
-            if decoded_log is None:
-                continue
+        # Extract each field for the whole batch at once instead of row by row
+        kept = [(raw_log, decoded_log.body) for raw_log, decoded_log in zip(event_data["raw_logs"], event_data["decoded_logs"]) if decoded_log is not None]
+        if not kept:
+            return pd.DataFrame()
 
-            swap_data = {
-                "block_number": raw_log.block_number,
-                "transaction_hash": raw_log.transaction_hash,
-                "pair_address": pair_results["pair_address"],
-                "pair_version": pair_results["pair_version"],
-            }
+        raw_logs = [raw_log for raw_log, _ in kept]
+        topics = [raw_log.topics for raw_log in raw_logs]
+        bodies = [body for _, body in kept]
 
-            if version == "V2":
-                swap_data.update({
-                    "sender": raw_log.topics[1] if len(raw_log.topics) > 1 else "N/A",
-                    "to": raw_log.topics[2] if len(raw_log.topics) > 2 else "N/A",
-                    "amount0In": decoded_log.body[0].val if len(decoded_log.body) > 0 else 0,
-                    "amount1In": decoded_log.body[1].val if len(decoded_log.body) > 1 else 0,
-                    "amount0Out": decoded_log.body[2].val if len(decoded_log.body) > 2 else 0,
-                    "amount1Out": decoded_log.body[3].val if len(decoded_log.body) > 3 else 0,
-                })
-            else:  # V3
-                swap_data.update({
-                    "sender": raw_log.topics[1] if len(raw_log.topics) > 1 else "N/A",
-                    "recipient": raw_log.topics[2] if len(raw_log.topics) > 2 else "N/A",
-                    "amount0": decoded_log.body[0].val if len(decoded_log.body) > 0 else 0,
-                    "amount1": decoded_log.body[1].val if len(decoded_log.body) > 1 else 0,
-                    "sqrtPriceX96": decoded_log.body[2].val if len(decoded_log.body) > 2 else 0,
-                    "liquidity": decoded_log.body[3].val if len(decoded_log.body) > 3 else 0,
-                    "tick": decoded_log.body[4].val if len(decoded_log.body) > 4 else 0,
-                })
+        swaps_data = {
+            "block_number": [raw_log.block_number for raw_log in raw_logs],
+            "transaction_hash": [raw_log.transaction_hash for raw_log in raw_logs],
+            "pair_address": [pair_results["pair_address"]] * len(kept),
+            "pair_version": [pair_results["pair_version"]] * len(kept),
+        }
 
-            swaps_data.append(swap_data)
+        if "V2" in event_type:
+            # V2 Swap: sender (indexed), amount0In, amount1In, amount0Out, amount1Out, to (indexed)
+            swaps_data["sender"] = self.topic_column(topics, 1)
+            swaps_data["to"] = self.topic_column(topics, 2)
+            swaps_data["amount0In"] = self.body_column(bodies, 0)
+            swaps_data["amount1In"] = self.body_column(bodies, 1)
+            swaps_data["amount0Out"] = self.body_column(bodies, 2)
+            swaps_data["amount1Out"] = self.body_column(bodies, 3)
+        else:
+            # V3 Swap: sender (indexed), recipient (indexed), amount0, amount1, sqrtPriceX96, liquidity, tick
+            swaps_data["sender"] = self.topic_column(topics, 1)
+            swaps_data["recipient"] = self.topic_column(topics, 2)
+            swaps_data["amount0"] = self.body_column(bodies, 0)
+            swaps_data["amount1"] = self.body_column(bodies, 1)
+            swaps_data["sqrtPriceX96"] = self.body_column(bodies, 2)
+            swaps_data["liquidity"] = self.body_column(bodies, 3)
+            swaps_data["tick"] = self.body_column(bodies, 4)
 
         df = pd.DataFrame(swaps_data)
-        if not df.empty:
-            df = df.sort_values(['block_number', 'transaction_hash']).reset_index(drop=True)
+        df = df.sort_values(['block_number', 'transaction_hash']).reset_index(drop=True)
         return df
 
     def process_mint_burn_events(self, pair_results: Dict[str, Any], event_type: str) -> pd.DataFrame:
         """Convert mint/burn events to pandas DataFrame."""
-        events_data = []
-
         if "events" not in pair_results or event_type not in pair_results["events"]:
-            return pd.DataFrame(events_data)
+            return pd.DataFrame()
 
         event_data = pair_results["events"][event_type]
         if not event_data.get("raw_logs") or not event_data.get("decoded_logs"):
-            return pd.DataFrame(events_data)
-
-        version = "V2" if "V2" in event_type else "V3"
-        is_mint = "Mint" in event_type
+            return pd.DataFrame()
 
-        for raw_log, decoded_log in zip(event_data["raw_logs"], event_data["decoded_logs"]):
-            if decoded_log is None:
-                continue
+        # Extract each field for the whole batch at once instead of row by row
+        kept = [(raw_log, decoded_log.body) for raw_log, decoded_log in zip(event_data["raw_logs"], event_data["decoded_logs"]) if decoded_log is not None]
+        if not kept:
+            return pd.DataFrame()
 
-            event_data_row = {
-                "block_number": raw_log.block_number,
-                "transaction_hash": raw_log.transaction_hash,
-                "pair_address": pair_results["pair_address"],
-                "pair_version": pair_results["pair_version"],
-                "event_type": "Mint" if is_mint else "Burn"
-            }
+        raw_logs = [raw_log for raw_log, _ in kept]
+        topics = [raw_log.topics for raw_log in raw_logs]
+        bodies = [body for _, body in kept]
 
-            if version == "V2":
-                if is_mint:
-                    # V2 Mint: sender (indexed), amount0, amount1
-                    event_data_row.update({
-                        "sender": raw_log.topics[1] if len(raw_log.topics) > 1 else "N/A",
-                        "amount0": decoded_log.body[0].val if len(decoded_log.body) > 0 else 0,
-                        "amount1": decoded_log.body[1].val if len(decoded_log.body) > 1 else 0,
-                    })
-                else:
-                    # V2 Burn: sender (indexed), amount0, amount1, to (indexed)
-                    event_data_row.update({
-                        "sender": raw_log.topics[1] if len(raw_log.topics) > 1 else "N/A",
-                        "to": raw_log.topics[2] if len(raw_log.topics) > 2 else "N/A",
-                        "amount0": decoded_log.body[0].val if len(decoded_log.body) > 0 else 0,
-                        "amount1": decoded_log.body[1].val if len(decoded_log.body) > 1 else 0,
-                    })
-            else:  # V3
-                if is_mint:
-                    # V3 Mint: sender, owner (indexed), tickLower (indexed), tickUpper (indexed), amount, amount0, amount1
-                    event_data_row.update({
-                        "sender": decoded_log.body[0].val if len(decoded_log.body) > 0 else "N/A",
-                        "owner": raw_log.topics[1] if len(raw_log.topics) > 1 else "N/A",
-                        "tickLower": int(raw_log.topics[2], 16) if len(raw_log.topics) > 2 else 0,
-                        "tickUpper": int(raw_log.topics[3], 16) if len(raw_log.topics) > 3 else 0,
-                        "amount": decoded_log.body[1].val if len(decoded_log.body) > 1 else 0,
-                        "amount0": decoded_log.body[2].val if len(decoded_log.body) > 2 else 0,
-                        "amount1": decoded_log.body[3].val if len(decoded_log.body) > 3 else 0,
-                    })
-                else:
-                    # V3 Burn: owner (indexed), tickLower (indexed), tickUpper (indexed), amount, amount0, amount1
-                    event_data_row.update({
-                        "owner": raw_log.topics[1] if len(raw_log.topics) > 1 else "N/A",
-                        "tickLower": int(raw_log.topics[2], 16) if len(raw_log.topics) > 2 else 0,
-                        "tickUpper": int(raw_log.topics[3], 16) if len(raw_log.topics) > 3 else 0,
-                        "amount": decoded_log.body[0].val if len(decoded_log.body) > 0 else 0,
-                        "amount0": decoded_log.body[1].val if len(decoded_log.body) > 1 else 0,
-                        "amount1": decoded_log.body[2].val if len(decoded_log.body) > 2 else 0,
-                    })
+        events_data = {
+            "block_number": [raw_log.block_number for raw_log in raw_logs],
+            "transaction_hash": [raw_log.transaction_hash for raw_log in raw_logs],
+            "pair_address": [pair_results["pair_address"]] * len(kept),
+            "pair_version": [pair_results["pair_version"]] * len(kept),
+            "event_type": ["Mint" if "Mint" in event_type else "Burn"] * len(kept),
+        }
 
-            events_data.append(event_data_row)
+        if event_type == "V2_Mint":
+            # V2 Mint: sender (indexed), amount0, amount1
+            events_data["sender"] = self.topic_column(topics, 1)
+            events_data["amount0"] = self.body_column(bodies, 0)
+            events_data["amount1"] = self.body_column(bodies, 1)
+        elif event_type == "V2_Burn":
+            # V2 Burn: sender (indexed), amount0, amount1, to (indexed)
+            events_data["sender"] = self.topic_column(topics, 1)
+            events_data["to"] = self.topic_column(topics, 2)
+            events_data["amount0"] = self.body_column(bodies, 0)
+            events_data["amount1"] = self.body_column(bodies, 1)
+        elif event_type == "V3_Mint":
+            # V3 Mint: sender, owner (indexed), tickLower (indexed), tickUpper (indexed), amount, amount0, amount1
+            events_data["sender"] = self.body_column(bodies, 0, "N/A")
+            events_data["owner"] = self.topic_column(topics, 1)
+            events_data["tickLower"] = self.tick_column(topics, 2)
+            events_data["tickUpper"] = self.tick_column(topics, 3)
+            events_data["amount"] = self.body_column(bodies, 1)
+            events_data["amount0"] = self.body_column(bodies, 2)
+            events_data["amount1"] = self.body_column(bodies, 3)
+        else:
+            # V3 Burn: owner (indexed), tickLower (indexed), tickUpper (indexed), amount, amount0, amount1
+            events_data["owner"] = self.topic_column(topics, 1)
+            events_data["tickLower"] = self.tick_column(topics, 2)
+            events_data["tickUpper"] = self.tick_column(topics, 3)
+            events_data["amount"] = self.body_column(bodies, 0)
+            events_data["amount0"] = self.body_column(bodies, 1)
+            events_data["amount1"] = self.body_column(bodies, 2)
 
         df = pd.DataFrame(events_data)
-        if not df.empty:
-            df = df.sort_values(['block_number', 'transaction_hash']).reset_index(drop=True)
+        df = df.sort_values(['block_number', 'transaction_hash']).reset_index(drop=True)
         return df
 
     async def analyze_token_to_excel(self, token_data: Dict[str, Any], from_block: int = 0, to_block: Optional[int] = None) -> str:
@@ -1428,13 +1485,29 @@ class TokenAnalyticsExcel:
         combined_mints = pd.DataFrame()
         combined_burns = pd.DataFrame()
 
+        pairs_data = token_data["token_data"].get("pairs_data", [])
+        pairs = [
+            (pair_info["pairAddress"], "v" + str(pair_info.get("labels", ["2"])[0]) if pair_info.get("labels") else "v2")
+            for pair_info in pairs_data
+        ]
+
+        # Run the Transfer query and the combined pair query concurrently; failures come back as exceptions
+        print(f"   📊 Fetching Transfer events and events for {len(pairs)} pairs...")
+        transfer_results, all_pair_events = await asyncio.gather(
+            self.fetch_transfer_events(token_address, from_block, to_block),
+            self.fetch_all_pairs_events(pairs, from_block, to_block),
+            return_exceptions=True,
+        )
+        if isinstance(all_pair_events, Exception):
+            all_pair_events = [all_pair_events] * len(pairs)
+
         # Initialize Excel writer
         with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
 
-            # 1. Fetch and process Transfer events
+            # 1. Process Transfer events
             try:
-                print(f"   📊 Fetching Transfer events...")
-                transfer_results = await self.fetch_transfer_events(token_address, from_block, to_block)
+                if isinstance(transfer_results, Exception):
+                    raise transfer_results
                 transfer_df = self.process_transfer_events(transfer_results)
 
                 if not transfer_df.empty:
@@ -1452,15 +1525,11 @@ class TokenAnalyticsExcel:
             all_mints = []
             all_burns = []
 
-            pairs_data = token_data["token_data"].get("pairs_data", [])
-
-            for pair_info in pairs_data:
-                pair_address = pair_info["pairAddress"]
-                pair_version = "v" + str(pair_info.get("labels", ["2"])[0]) if pair_info.get("labels") else "v2"
-
+            for (pair_address, pair_version), pair_events in zip(pairs, all_pair_events):
                 try:
-                    print(f"   📊 Fetching events for {pair_version} pair {pair_address}...")
-                    pair_events = await self.fetch_pair_events(pair_address, pair_version, from_block, to_block)
+                    print(f"   📊 Processing events for {pair_version} pair {pair_address}...")
+                    if isinstance(pair_events, Exception):
+                        raise pair_events
 
                     if "error" in pair_events:
                         print(f"   ⚠️  Skipping pair {pair_address}: {pair_events['error']}")
@@ -1491,6 +1560,10 @@ class TokenAnalyticsExcel:
                 except Exception as e:
                     print(f"   ❌ Error processing pair {pair_address}: {e}")
 
+            # Everything downstream reads the DataFrames, so release the raw and decoded logs
+            # before the wash trading analysis
+            transfer_results = all_pair_events = pair_events = None
+
             # 3. Combine and export all event types
             if all_swaps_v2:
                 combined_swaps_v2 = pd.concat(all_swaps_v2, ignore_index=True)
@@ -1661,8 +1734,7 @@ class TokenAnalyticsExcel:
                         # Convert DataFrame to JSON-serializable format
                         aggregated_json_data = aggregated_timeline_export_final.to_dict('records')
 
-                        # Save as JSON file
-                        import json
+                        # Save as JSON file (stdlib json: raw_data carries uint256 ints that orjson cannot encode)
                         with open(json_filepath, 'w') as json_file:
                             json.dump(aggregated_json_data, json_file, indent=2, default=str)
 
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test that analyze_many returns one result per job, in job order, matching
+analyze_token_data, without routing its work through the shared 4-worker pool
+"""
+import os
+import sys
+import tempfile
+
+import orjson
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+import analyze_cluster_balances
+
+def _write(directory, name, data):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data))
+    return path
+
+def _make_job(directory, index, cluster_balance):
+    """Files for one token; no token_address, so no Etherscan or LLM calls are made"""
+    cluster_address = f'0xa{index:039x}'
+    pool_address = f'0xb{index:039x}'
+    clusters = {'result': {'cluster_id': f'c{index}', 'addresses': [cluster_address], 'confidence_level': 'High', 'reasoning': 'r'}}
+    balances = {
+        'metadata': {'timestamp': f't{index}', 'total_addresses': 2},
+        'balances': [
+            {'address': pool_address, 'token_balance_raw': 600, 'token_balance_formatted': '600', 'eth_balance_eth': 1.5, 'eth_balance_wei': 1500000000000000000},
+            {'address': cluster_address, 'token_balance_raw': cluster_balance, 'token_balance_formatted': str(cluster_balance), 'eth_balance_eth': 0.1, 'eth_balance_wei': 100000000000000000},
+        ],
+    }
+    timeline = [{'from_address': analyze_cluster_balances.ZERO_ADDRESS, 'raw_data': {'value': 1000}, 'value': '1000'}]
+    return (
+        _write(directory, f'clusters_{index}.json', clusters),
+        _write(directory, f'balances_{index}.json', balances),
+        _write(directory, f'timeline_{index}.json', timeline),
+    )
+
+class _NoSharedPool:
+    def submit(self, *args, **kwargs):
+        raise AssertionError('analyze_many must not use the shared executor')
+
+def test_analyze_many_matches_analyze_token_data():
+    with tempfile.TemporaryDirectory() as directory:
+        jobs = [_make_job(directory, i, 10 * (i + 1)) for i in range(5)]
+        jobs.append((os.path.join(directory, 'missing.json'), jobs[0][1], jobs[0][2]))
+
+        expected = [analyze_cluster_balances.analyze_token_data(*job) for job in jobs]
+
+        shared_executor = analyze_cluster_balances._executor
+        analyze_cluster_balances._executor = _NoSharedPool()
+        try:
+            actual = analyze_cluster_balances.analyze_many(jobs, max_workers=3)
+        finally:
+            analyze_cluster_balances._executor = shared_executor
+
+    assert actual == expected
+    assert [results['timestamp'] for results in actual] == ['t0', 't1', 't2', 't3', 't4', None]
+    assert actual[-1]['errors'] == [f"Failed to load {jobs[-1][0]}"]
+
+if __name__ == '__main__':
+    test_analyze_many_matches_analyze_token_data()
+    print('analyze_many results match analyze_token_data')
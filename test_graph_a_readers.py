@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test that graph_a's streaming and pandas readers extract the same events, including
+from rows carrying pandas' default NA placeholders
+"""
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+from graph_a import _read_events_dataframe, _read_events_streaming
+
+COLUMNS = ['block_number', 'event_type', 'from_address', 'to_address', 'value_formatted', 'initiators', 'transaction_type']
+
+ROWS = [
+    ['100', 'Transfer', '0x0000000000000000000000000000000000000000', '0xAAAA000000000000000000000000000000000001', '1,000.00', '0xAAAA000000000000000000000000000000000001', 'Transfer'],
+    ['101.0', 'Transfer', '0xAAAA000000000000000000000000000000000001', 'N/A', '5.00', 'null', 'NA'],
+    ['N/A', 'Transfer', 'null', '0xBBBB000000000000000000000000000000000002', 'NaN', 'None', ''],
+    ['102', 'Mint', '', '', '0.00', 'N/A', 'Mint'],
+    ['102', 'Mint', '', '', '0.00', '0xCCCC000000000000000000000000000000000003', 'Mint'],
+    ['103', 'V2_Swap', '', '', '12.50', '0xBBBB000000000000000000000000000000000002', 'BUY'],
+    ['103.0', 'V2_Swap', '', '', '12.50', 'n/a', 'BUY'],
+    ['12.7', 'V2_Swap', '', '', 'nan', 'NULL', 'None'],
+    ['x', 'V2_Swap', '', '', '3', '0xBBBB000000000000000000000000000000000002', '<NA>'],
+]
+
+def _normalize(value):
+    """Make NaN compare equal to NaN so whole event lists can be compared"""
+    if isinstance(value, float) and math.isnan(value):
+        return 'nan'
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+def test_readers_agree_on_na_placeholders():
+    data_string = '\n'.join('\t'.join(row) for row in [COLUMNS] + ROWS)
+
+    streaming = _read_events_streaming(data_string)
+    dataframe = _read_events_dataframe(data_string)
+
+    assert streaming.keys() == dataframe.keys()
+    for key in streaming:
+        assert _normalize(streaming[key]) == _normalize(dataframe[key]), key
+
+if __name__ == '__main__':
+    test_readers_agree_on_na_placeholders()
+    print('streaming and pandas readers agree')